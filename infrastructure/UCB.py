@@ -2,33 +2,67 @@ from infrastructure import *
 from math import sqrt
 from numpy import log
 import numpy as np
-import matplotlib.pyplot as plt
+from ucb_index import IndexTree
 
 
 machines = [bernoulli_machine(i) for i in [0.33, 0.55, 0.6]] 
 
 
 class UCB_bernoulli(Game):
+    """
+    UCB with index mean_i + sqrt(alpha log(t) / (2 n_i)).
+
+    The argmax of the indices is kept by a ucb_index.IndexTree, so a turn
+    costs O(log K) rather than recomputing all K indices. Decisions are
+    those of taking np.argmax over every index, which is still what
+    indices() returns.
+    """
+
     def __init__(self, turns, alpha, *machines):
         super().__init__(turns, *machines)
         self.alpha = alpha
-        self.UCB_indices = [0]*self.machine_count
+        self.index_tree = None
+        self.log_turn = 0
         true_means = [m.mean for m in machines]
         max_mean = max(true_means)
         self.del_i = np.sort(max_mean - np.array(true_means))
         # self.bounds = []
 
+    def index(self, i):
+        """
+        Returns the index of machine i as of the last update.
+        """
+        return self.means[i] + sqrt(self.alpha * self.log_turn /
+                                    (2 * self.count(i)))
+
+    def indices(self):
+        """
+        Returns the indices of all the machines as of the last update.
+        """
+        return [self.index(i) for i in range(self.machine_count)]
+
+    def _line(self, i):
+        return self.means[i], sqrt(self.alpha / (2 * self.count(i)))
+
     def decide(self):
         if self.next_turn <= self.machine_count:
             return self.next_turn % self.machine_count
-        return np.argmax(self.UCB_indices)
+        # no index has been computed before the update of turn K + 1
+        if self.index_tree is None:
+            return 0
+        return self.index_tree.best
 
     def _update(self, index, outcome):
         super()._update(index, outcome)
         if self.next_turn >= self.machine_count + 1:
-            self.UCB_indices = [m + sqrt(self.alpha * log(self.next_turn-1) /
-                                (2 * len(self.history[i])))
-                                for i, m in enumerate(self.means)]
+            self.log_turn = log(self.next_turn-1)
+            s = sqrt(self.log_turn)
+            if self.index_tree is None:
+                self.index_tree = IndexTree(self.machine_count, self.index,
+                                            self._line)
+                self.index_tree.build(s)
+            else:
+                self.index_tree.update(index, s)
         # self.bounds.append(get_bound(self.del_i, self.next_turn - 1, self.alpha))
 
 
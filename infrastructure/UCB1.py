@@ -1,7 +1,6 @@
 from infrastructure import *
 import numpy as np
 from math import log, sqrt
-import matplotlib.pyplot as plt
 
 machines = [bernoulli_machine(p) for p in [0.1, 0.5, 0.8, 0.05]]
 
@@ -18,12 +17,11 @@ class UCB1(Game):
 
     def _update(self, index, outcome):
         super()._update(index, outcome)
-        true_means = [m.mean for m in machines]
-        max_mean = max(true_means)
         if self.next_turn >= self.machine_count + 1:
             self.UCB1_indices = [self.means[i] + sqrt(2*log(self.next_turn)
-                                 / len(self.history[i]))
+                                 / self.count(i))
                                  for i in range(self.machine_count)]
 
 
-obj1 = UCB1(10000, *machines).historical_regret
+if __name__ == '__main__':
+    obj1 = UCB1(10000, *machines).historical_regret
@@ -1,31 +1,53 @@
-from infrastructure import *
-import numpy as np
-from math import log,sqrt
-import matplotlib.pyplot as plt
-
-machines = [bernoulli_machine(i) for i in [0.33, 0.55, 0.6]]
-
-class UCB1_tuned(Game):
-    def __init__(self, turns, *machines):
-        super().__init__(turns,*machines)
-        self.UCB_indices = [0]*self.machine_count
-        self.UCB_for_var = [0]*self.machine_count
-
-    def _update(self, index, outcome):
-        super()._update(index,outcome)
-        if self.next_turn >= self.machine_count + 1:
-            self.UCB_for_var = [(1/len(history))*sum(reward**2 for reward in history) - self.means[i]**2 +
-                            sqrt(2*log(self.next_turn)/len(history)) for i,history in enumerate(self.history)]
-            
-            self.UCB_indices =  [self.means[i] + sqrt(log(self.next_turn)/len(self.history[i])*min(1/4,self.UCB_for_var[i])) for i in range(self.machine_count)]
-
-
-    def decide(self):
-        if self.next_turn <= self.machine_count:
-            return self.next_turn % self.machine_count
-        return np.argmax(self.UCB_indices)
-
-
-obj5 = UCB1_tuned(10000,*machines)
-print(obj5.simulate()/10000)
-
+from infrastructure import *
+import numpy as np
+from math import log
+
+machines = [bernoulli_machine(i) for i in [0.33, 0.55, 0.6]]
+
+class UCB1_tuned(Game):
+    """
+    UCB1-tuned: UCB1 with the exploration term scaled by an upper bound on
+    the variance of each machine.
+
+    The counts, means and sums of squared outcomes of the machines are kept
+    in arrays updated in O(1) per turn, and the indices are computed from
+    them, vectorised, when deciding. Decisions are the same as those of the
+    former version rebuilding every index from the histories each turn.
+    """
+
+    def __init__(self, turns, *machines):
+        super().__init__(turns,*machines)
+        self.pulls = np.zeros(self.machine_count)
+        self.mean_outcomes = np.zeros(self.machine_count)
+        self.sum_squares = np.zeros(self.machine_count)
+
+    def _update(self, index, outcome):
+        super()._update(index,outcome)
+        self.pulls[index] += 1
+        self.mean_outcomes[index] = self.means[index]
+        self.sum_squares[index] += outcome**2
+
+    def indices(self, turn):
+        """
+        Returns the UCB1-tuned index of every machine after the given turn.
+        """
+        # math.log, not np.log, keeps the indices bitwise equal to the
+        # former scalar code
+        log_turn = log(turn)
+        n, means = self.pulls, self.mean_outcomes
+        variance_bound = (1/n)*self.sum_squares - means**2 + np.sqrt(2*log_turn/n)
+        return means + np.sqrt(log_turn/n*np.minimum(1/4, variance_bound))
+
+    def decide(self):
+        if self.next_turn <= self.machine_count:
+            return self.next_turn % self.machine_count
+        # the indices are first computed after turn K + 1, and were all
+        # still 0 at that turn
+        if self.next_turn == self.machine_count + 1:
+            return 0
+        return np.argmax(self.indices(self.next_turn - 1))
+
+
+if __name__ == '__main__':
+    obj5 = UCB1_tuned(10000,*machines)
+    print(obj5.simulate()/10000)
@@ -1,31 +1,67 @@
 from infrastructure import *
 from math import sqrt, log
-import numpy as np
-import matplotlib.pyplot as plt
+from ucb_index import CountTree, IndexTree
 
 machines = [bernoulli_machine(p) for p in [0.1, 0.5, 0.78, 0.8, 0.05]]
 
 class UCB1_normal(Game):
+    """
+    UCB1-normal: every machine is first played until it has been played
+    8 log(t) times, then the machine with the largest index
+    mean_i + sqrt(16 q_i log(t) / ((n_i - 1) n_i)) is played, where q_i is
+    the sum of squared deviations of its outcomes.
+
+    The lowest under-played machine is found with a ucb_index.CountTree and
+    the argmax of the indices is kept by a ucb_index.IndexTree, so a turn
+    costs O(log K).
+    """
     def __init__(self, turns, *machines):
         super().__init__(turns, *machines)
         self.sum_of_squared_rewards = [0] * self.machine_count
-        self.UCB_normal_indices = [0]* self.machine_count
+        self.count_tree = CountTree(self.machine_count)
+        self.index_tree = None
+        self.log_turn = 0
+
+    def index(self, i):
+        """
+        Returns the index of machine i as of the last update.
+        """
+        s = self.sum_of_squared_rewards[i]
+        return self.means[i] + sqrt(16* (s - self.count(i)*self.means[i]**2)* self.log_turn/
+                                    ((self.count(i) -1)*self.count(i)))
+
+    def indices(self):
+        """
+        Returns the indices of all the machines as of the last update.
+        """
+        return [self.index(i) for i in range(self.machine_count)]
+
+    def _line(self, i):
+        s = self.sum_of_squared_rewards[i]
+        return self.means[i], sqrt(16* (s - self.count(i)*self.means[i]**2)/
+                                   ((self.count(i) -1)*self.count(i)))
 
     def decide(self):
         if self.next_turn <= 2* self.machine_count:
             return self.next_turn % self.machine_count
-        for i in range(self.machine_count):
-            if len(self.history[i]) < 8 *log(self.next_turn): return i
-        return np.argmax(self.UCB_normal_indices)
+        i = self.count_tree.lowest_below(8 *log(self.next_turn))
+        if i is not None:
+            return i
+        # no index has been computed before the update of turn 2K + 1
+        if self.index_tree is None:
+            return 0
+        return self.index_tree.best
 
 
     def _update(self, index, outcome):
         super()._update(index, outcome)
         self.sum_of_squared_rewards[index] += outcome**2
+        self.count_tree.set(index, self.count(index))
         if self.next_turn > 2* self.machine_count:
-            self.UCB_normal_indices = [self.means[i] + sqrt(16* (s - len(self.history[i])*self.means[i]**2)* log(self.next_turn -1)/
-                                        ((len(self.history[i]) -1)*len(self.history[i])))
-                                        for i,s in enumerate(self.sum_of_squared_rewards)]
-
-
-
+            self.log_turn = log(self.next_turn -1)
+            if self.index_tree is None:
+                self.index_tree = IndexTree(self.machine_count, self.index,
+                                            self._line)
+                self.index_tree.build(sqrt(self.log_turn))
+            else:
+                self.index_tree.update(index, sqrt(self.log_turn))
@@ -1,9 +1,7 @@
 from infrastructure import *
 from math import sqrt
 from numpy import log
-from running_stats import RunningStats
 import numpy as np
-import matplotlib.pyplot as plt
 
 
 machines = [bernoulli_machine(i) for i in [0.33, 0.55, 0.6]]
@@ -15,17 +13,13 @@ class WLLN(Game):
         self.explore_count = explore_count
         self.sds = [0] * self.machine_count
         self.scores = [0] * self.machine_count
-        self.times_chosen = [0] * self.machine_count
-        self.rs = [RunningStats() for i in range(self.machine_count)]
         self.z = z
 
     def _update(self, index, outcome):
         super()._update(index, outcome)
-        self.rs[index].push(outcome)
-        self.sds[index] = self.rs[index].standard_deviation()
-        self.times_chosen[index] += 1
+        self.sds[index] = sqrt(self.variance(index))
         self.scores[index] = self.means[index] + self.z * self.sds[index] / \
-                            sqrt(self.times_chosen[index])
+                            sqrt(self.count(index))
 
     def decide(self):
         if self.next_turn <= self.machine_count * self.explore_count:
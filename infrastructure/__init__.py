@@ -1 +1,24 @@
-from .decision import *
\ No newline at end of file
+"""
+Multi-armed bandit simulations.
+
+The modules of this directory import each other by their bare names
+(from infrastructure import *, from runner import ...), as when they are
+run as scripts from here, so the directory is added to sys.path when the
+package is imported.
+"""
+
+import os as _os
+import sys as _sys
+
+_sys.path.append(_os.path.dirname(__file__))
+
+from .infrastructure import *  # noqa: E402,F401,F403
+
+
+def __getattr__(name):
+    # strategies are imported on first use, see strategies.py
+    from strategies import STRATEGY_MODULES, get_strategy
+
+    if name in STRATEGY_MODULES:
+        return get_strategy(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,9 +1,7 @@
 from infrastructure import *
-from RPM import RPMBernoulli
-from TS import ThompsonSamplingBernoulli
 import matplotlib.pyplot as plt
-import dill
-import bz2
+from results import load_results
+from bands import regret_bands
 import numpy as np
 
 # with bz2.BZ2File('ts_n100_T5000.bz2', 'wb') as handle:
@@ -22,8 +20,7 @@ names = ['Thompson sampling', 'Randomised probability matching', 'Greedy Bayesia
 colors = ['red', 'black', 'green', 'yellow']
 strats = []
 for file in files:
-    with bz2.open(file, 'rb') as handle:
-        strats.append(dill.load(handle))
+    strats.append(load_results(file))
 
 # with bz2.open('ts_n100_T5000.bz2', 'rb') as handle:
 #     ts_games = dill.load(handle)
@@ -37,16 +34,19 @@ n = 100     # no of simulations
 T = 5000    # horizon
 
 # get regrets as arrays
-hist_regret_arrs = [np.array([game.historical_regret for game in games]) for games in strats]
+hist_regret_arrs = [results.regret for results in strats]
 
 # # compare cumulative regret
 # ts_regret = np.array([ts_game.historical_regret for ts_game in ts_games])
 # rpm_regret = np.array([rpm_game.historical_regret for rpm_game in rpm_games])
 
 
+# mean and 95% band of each strategy in one pass over its regret matrix
+strat_bands = [regret_bands(arr, [95]) for arr in hist_regret_arrs]
+
 fig, ax = plt.subplots()
-for arr, col in zip(hist_regret_arrs, colors):
-    ax.plot(range(T+1), np.mean(arr, axis=0), color=col)
+for results, (mean, bands), col in zip(strats, strat_bands, colors):
+    ax.plot(results.regret_turns, mean, color=col)
 ax.legend(names, loc='upper left')
 
 # # plot averaged cumulative regret with 95% confidence interval
@@ -55,17 +55,16 @@ ax.legend(names, loc='upper left')
 # ax.plot(range(T+1), np.mean(rpm_regret, axis=0), color = 'black')
 # ax.legend(['Thompson sampling', 'Randomised probability matching'])
 
-upper, lower = 97.5, 2.5
-uppers = [np.percentile(hist_regret, upper, axis=0) for hist_regret in hist_regret_arrs]
-lowers = [np.percentile(hist_regret, lower, axis=0) for hist_regret in hist_regret_arrs]
+uppers = [bands[95][0] for mean, bands in strat_bands]
+lowers = [bands[95][1] for mean, bands in strat_bands]
 # ts_regret_u = np.percentile(ts_regret, 97.5, axis=0)
 # ts_regret_b = np.percentile(ts_regret, 2.5, axis=0)
 # rpm_regret_u = np.percentile(rpm_regret, 97.5, axis=0)
 # rpm_regret_b = np.percentile(rpm_regret, 2.5, axis=0)
 
 
-for b, u, col in zip(lowers, uppers, colors):
-    ax.fill_between(range(T+1), b, u, alpha=0.7, color=col)
+for results, b, u, col in zip(strats, lowers, uppers, colors):
+    ax.fill_between(results.regret_turns, b, u, alpha=0.7, color=col)
 
 # ax.fill_between(range(T+1), ts_regret_b, ts_regret_u, color='red', alpha=0.5)
 # ax.fill_between(range(T+1), rpm_regret_b, rpm_regret_u, color='gray', alpha=0.5)
@@ -0,0 +1,52 @@
+"""
+Mean and confidence bands of regret matrices too large for memory.
+
+A regret matrix has one row per replicate and one column per turn (or
+checkpoint). regret_bands reads it in blocks of columns, so it works on a
+np.memmap (e.g. ResultSet.regret) of any size, and computes the mean and
+the bands of every requested confidence in a single pass.
+"""
+
+import numpy as np
+
+
+def open_regret_matrix(path, shape=None):
+    """
+    Memory-maps a regret matrix stored as a .npy file. With shape, a new
+    float64 file of that shape (replicates, columns) is created for writing
+    row by row; otherwise an existing one is opened read-only.
+    """
+    if shape is None:
+        return np.load(path, mmap_mode='r')
+    return np.lib.format.open_memmap(path, mode='w+', dtype=np.float64,
+                                     shape=shape)
+
+
+def regret_bands(regret, confidences=(95,), memory=2**27):
+    """
+    Returns the mean regret and a dict mapping every confidence to its
+    (upper, lower) band, i.e. the 50 + c/2 and 50 - c/2 percentiles across
+    replicates, as in cutsom_analysis.get_u_b.
+
+    Parameters:
+    -----------
+    regret:
+        replicates x columns array or memmap
+    confidences:
+        confidences in percent, e.g. [95, 70, 50]
+    memory:
+        approximate number of bytes of regret read at once
+    """
+    replicates, columns = regret.shape
+    percentiles = sorted({50 + sign * c / 2 for c in confidences
+                          for sign in (1, -1)})
+    mean = np.empty(columns)
+    values = np.empty((len(percentiles), columns))
+    step = max(1, memory // (8 * replicates))
+    for start in range(0, columns, step):
+        block = np.asarray(regret[:, start:start + step], dtype=float)
+        mean[start:start + step] = block.mean(axis=0)
+        values[:, start:start + step] = np.percentile(block, percentiles,
+                                                      axis=0)
+    rows = {p: row for p, row in zip(percentiles, values)}
+    return mean, {c: (rows[50 + c / 2], rows[50 - c / 2]) for c in confidences}
@@ -0,0 +1,384 @@
+"""
+Throughput and memory benchmarks of the strategies.
+
+Every benchmark plays one game of a strategy against K Bernoulli machines
+for T turns, in a fresh process, and records:
+
+    turns_per_second    turns played per second of simulate
+    peak_rss            peak resident set size of the process in bytes
+    bytes_per_turn      peak of the memory allocated while playing, per
+                        turn, traced by tracemalloc in a replay of the
+                        turns timed (tracing would slow the timed pass)
+    t_exponent          b in per-turn cost ~ t^b, fitted over doubling
+                        windows of turns after the initial exploration
+    k_exponent          a in per-turn cost ~ K^a, fitted across the K of
+                        the same strategy and T
+
+Every benchmark declares the length of its warm-up, e.g. the round robin
+of the index strategies or the exploration half of ExploreExploit, and the
+windows overlapping it are left out of the fit of t_exponent.
+
+A strategy is flagged when an exponent exceeds the complexity expected of
+it by more than TOLERANCE, e.g. a per-turn cost growing with t because
+every update scans the whole history. A case stops after max_seconds and
+reports the turns it managed, so the full grid finishes in bounded time.
+
+Results are saved as JSON; --compare prints the throughput ratio of every
+case against an earlier file.
+
+Usage
+-----
+    python benchmark.py --strategies UCB1_tuned TS --arms 2 10 100 \\
+        --turns 1000 100000 --output after.json --compare before.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import time
+import tracemalloc
+from collections import namedtuple
+from functools import partial
+
+import numpy as np
+from infrastructure import DEFAULT_BUFFER_SIZE, Game, bernoulli_machine
+from strategies import get_strategy
+from sweep import STRATEGIES, randomised_probability_matching, uniform_priors
+
+
+ARMS = [2, 10, 100, 10**4]
+TURNS = [10**3, 10**4, 10**5, 10**6]
+TOLERANCE = 0.5
+
+
+def round_robin(arms, turns):
+    # the initial round robin of the index strategies, twice over
+    return 2 * arms
+
+
+def no_warmup(arms, turns):
+    return 0
+
+
+def half_turns(arms, turns):
+    # strategies exploring uniformly for the first half of the game
+    return turns // 2
+
+
+def wlln_warmup(arms, turns):
+    # WLLN plays every arm explore_count = 10 times first
+    return 10 * arms
+
+
+# expected per-turn cost O(K^arms t^turns), after warmup(K, T) turns
+Benchmark = namedtuple('Benchmark', ['factory', 'arms', 'turns', 'warmup'],
+                       defaults=[round_robin])
+
+
+def ucb1(turns, *machines):
+    return get_strategy('UCB1')(turns, *machines)
+
+
+def ucb1_normal(turns, *machines):
+    return get_strategy('UCB1_normal')(turns, *machines)
+
+
+def wlln(turns, *machines):
+    return get_strategy('WLLN')(turns, 10, 1.96, *machines)
+
+
+def epsilon_greedy(turns, *machines):
+    return get_strategy('epsilon_greedy')(turns, *machines, epsilon=0.5)
+
+
+def always_pick_first(turns, *machines):
+    from example_code import AlwaysPickFirst
+
+    return AlwaysPickFirst(turns, *machines)
+
+
+def explore_exploit(turns, *machines):
+    from example_code2 import ExploreExploit
+
+    return ExploreExploit(0.5, turns, *machines)
+
+
+def highest_variance(turns, *machines):
+    from example_code3 import HighestVariance
+
+    return HighestVariance(turns, *machines)
+
+
+def lowest_variance(turns, *machines):
+    from example_code3 import LowestVariance
+
+    return LowestVariance(turns, *machines)
+
+
+def lazy_thompson_sampling(turns, *machines):
+    return get_strategy('LazyThompsonSamplingBernoulli')(
+        uniform_priors(machines), turns, *machines)
+
+
+def exp3_ix(turns, *machines):
+    return get_strategy('Exp3IX')(turns, *machines)
+
+
+def exp3_p(turns, *machines):
+    return get_strategy('Exp3P')(turns, *machines)
+
+
+class ZoomingGame(Game):
+    """
+    Plays the Zooming algorithm on the machines laid out over [0, 1], arm x
+    pulling machine floor(x K), so it can be benchmarked like the strategies.
+    """
+
+    def __init__(self, turns, *machines, delta=0.1, c=0.01, nu=1.0):
+        super().__init__(turns, *machines)
+        self.zooming = get_strategy('Zooming')(delta, turns, c, nu)
+        self.zooming.initialize()
+
+    def decide(self):
+        pulled = self.zooming.output()
+        arm = self.zooming.active_arms[pulled]
+        return min(int(arm * self.machine_count), self.machine_count - 1)
+
+    def _update(self, index, outcome):
+        super()._update(index, outcome)
+        self.zooming.observe(self.next_turn, outcome)
+
+
+def zooming(turns, *machines):
+    return ZoomingGame(turns, *machines)
+
+
+BENCHMARKS = {
+    'TS': Benchmark(STRATEGIES['TS'], 1, 0),
+    'rpm': Benchmark(STRATEGIES['rpm'], 1, 0),
+    'gbb': Benchmark(STRATEGIES['gbb'], 1, 0),
+    'UCB': Benchmark(STRATEGIES['UCB'], 1, 0),
+    'UCB1_tuned': Benchmark(STRATEGIES['UCB1_tuned'], 1, 0),
+    'Exp3': Benchmark(STRATEGIES['Exp3'], 1, 0),
+    'rpm_quadrature': Benchmark(partial(randomised_probability_matching,
+                                        method='quadrature'), 1, 0),
+    'LazyTS': Benchmark(lazy_thompson_sampling, 1, 0),
+    'Exp3IX': Benchmark(exp3_ix, 1, 0),
+    'Exp3P': Benchmark(exp3_p, 1, 0),
+    'UCB1': Benchmark(ucb1, 1, 0),
+    'UCB1_normal': Benchmark(ucb1_normal, 1, 0),
+    'WLLN': Benchmark(wlln, 1, 0, wlln_warmup),
+    'epsilon_greedy': Benchmark(epsilon_greedy, 1, 0),
+    'AlwaysPickFirst': Benchmark(always_pick_first, 0, 0, no_warmup),
+    'ExploreExploit': Benchmark(explore_exploit, 1, 0, half_turns),
+    'HighestVariance': Benchmark(highest_variance, 1, 0, half_turns),
+    'LowestVariance': Benchmark(lowest_variance, 1, 0, half_turns),
+    # a turn scans the active arms, of which there are O(t^(1/3)) on [0, 1]
+    'Zooming': Benchmark(zooming, 0, 1/3, no_warmup),
+}
+
+
+def benchmark_machines(arms, seed=0):
+    """
+    Returns arms Bernoulli machines with means spread over [0.1, 0.9] in a
+    random order. Buffers are kept small for many arms so the outcome
+    blocks do not dominate the memory measurements.
+    """
+    means = np.random.default_rng(seed).permutation(np.linspace(0.1, 0.9,
+                                                                arms))
+    buffer_size = min(DEFAULT_BUFFER_SIZE, max(64, 2**20 // arms))
+    return [bernoulli_machine(p, buffer_size=buffer_size) for p in means]
+
+
+def peak_rss():
+    """
+    Returns the peak resident set size of the process in bytes.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if platform.system() == 'Darwin' else peak * 1024
+
+
+def fit_exponent(x, cost):
+    """
+    Returns the slope of log(cost) against log(x), or None with fewer than
+    two points.
+    """
+    if len(x) < 2:
+        return None
+    return float(np.polyfit(np.log(x), np.log(cost), 1)[0])
+
+
+def build_case(name, arms, turns, seed):
+    """
+    Returns the game of a benchmark, with numpy's global RNG seeded.
+    """
+    np.random.seed(seed)
+    machines = benchmark_machines(arms, seed)
+    return BENCHMARKS[name].factory(turns, *machines)
+
+
+def traced_bytes_per_turn(name, arms, turns, played, seed=0):
+    """
+    Replays the first played turns of a benchmark under tracemalloc and
+    returns the peak of the memory allocated while playing, per turn.
+    """
+    game = build_case(name, arms, turns, seed)
+    tracemalloc.start()
+    try:
+        while game.next_turn <= played:
+            game._step()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peak / played
+
+
+def run_case(name, arms, turns, max_seconds, seed=0):
+    """
+    Plays one benchmark and returns its measurements as a dict.
+    """
+    game = build_case(name, arms, turns, seed)
+    warmup = BENCHMARKS[name].warmup(arms, turns)
+    # per-turn cost over the windows of turns [2^k, 2^(k+1))
+    windows = []
+    start = time.perf_counter()
+    deadline = start + max_seconds
+    window_start, first, boundary = start, 1, 2
+    while game.next_turn <= turns:
+        game._step()
+        now = time.perf_counter()
+        if game.next_turn == boundary or now > deadline:
+            windows.append((first, game.next_turn - 1, now - window_start))
+            window_start, first, boundary = now, game.next_turn, 2 * boundary
+            if now > deadline:
+                break
+    seconds = time.perf_counter() - start
+    if first < game.next_turn:
+        windows.append((first, game.next_turn - 1,
+                        time.perf_counter() - window_start))
+    played = game.next_turn - 1
+    del game
+    # skip the warm-up of the strategy and tiny windows
+    fitted = [(np.sqrt(a * b), s / (b - a + 1)) for a, b, s in windows
+              if a > warmup and b - a >= 63]
+    return {
+        'strategy': name, 'arms': arms, 'turns': turns, 'played': played,
+        'completed': played == turns, 'seconds': seconds,
+        'turns_per_second': played / seconds if seconds else None,
+        'peak_rss': peak_rss(),
+        'bytes_per_turn': traced_bytes_per_turn(name, arms, turns, played,
+                                                seed),
+        't_exponent': fit_exponent(*zip(*fitted)) if fitted else None,
+        'windows': windows,
+    }
+
+
+def flag_cases(results):
+    """
+    Adds k_exponent to every result, fitted over K >= 10 for the same
+    strategy and T, and returns the list of flags of the strategies whose
+    per-turn cost grows faster than expected.
+    """
+    flags = []
+    for result in results:
+        expected = BENCHMARKS[result['strategy']]
+        b = result['t_exponent']
+        if b is not None and b > expected.turns + TOLERANCE:
+            flags.append(f"{result['strategy']} (K={result['arms']}, "
+                         f"T={result['turns']}): per-turn cost grows like "
+                         f"t^{b:.2f}, expected t^{expected.turns:.2g}")
+    groups = {}
+    for result in results:
+        if result['arms'] >= 10 and result['turns_per_second']:
+            groups.setdefault((result['strategy'], result['turns']),
+                              []).append(result)
+    for (strategy, turns), group in groups.items():
+        a = fit_exponent([r['arms'] for r in group],
+                         [1 / r['turns_per_second'] for r in group])
+        for result in group:
+            result['k_exponent'] = a
+        expected = BENCHMARKS[strategy]
+        if a is not None and a > expected.arms + TOLERANCE:
+            flags.append(f"{strategy} (T={turns}): per-turn cost grows like "
+                         f"K^{a:.2f}, expected K^{expected.arms}")
+    return flags
+
+
+def run_benchmarks(strategies, arms, turns, max_seconds=2.0, seed=0,
+                   progress=print):
+    """
+    Runs every (strategy, K, T) case in a fresh process, one at a time so
+    the measurements do not interfere, and returns the results and flags.
+    """
+    context = multiprocessing.get_context('spawn')
+    results = []
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        for name in strategies:
+            for k in arms:
+                for t in turns:
+                    result = pool.apply(run_case, (name, k, t, max_seconds,
+                                                   seed))
+                    results.append(result)
+                    if progress is not None:
+                        progress(f"{name:>16} K={k:<6} T={t:<8} "
+                                 f"{result['turns_per_second']:12.0f} turns/s"
+                                 f" {result['bytes_per_turn']:10.1f} B/turn"
+                                 f"{'' if result['completed'] else '  (cut)'}")
+    return results, flag_cases(results)
+
+
+def compare(results, path):
+    """
+    Prints the throughput of every case relative to an earlier run.
+    """
+    with open(path) as handle:
+        before = {(r['strategy'], r['arms'], r['turns']): r
+                  for r in json.load(handle)['results']}
+    for result in results:
+        old = before.get((result['strategy'], result['arms'],
+                          result['turns']))
+        if old and old['turns_per_second'] and result['turns_per_second']:
+            ratio = result['turns_per_second'] / old['turns_per_second']
+            print(f"{result['strategy']:>16} K={result['arms']:<6} "
+                  f"T={result['turns']:<8} {ratio:6.2f}x")
+
+
+def main(argv=None):
+    """
+    Command line entry point (bandit-benchmark).
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark throughput and memory of the strategies.')
+    parser.add_argument('--strategies', nargs='+', default=list(BENCHMARKS),
+                        choices=list(BENCHMARKS), metavar='STRATEGY')
+    parser.add_argument('--arms', nargs='+', type=int, default=ARMS)
+    parser.add_argument('--turns', nargs='+', type=int, default=TURNS)
+    parser.add_argument('--max-seconds', type=float, default=2.0,
+                        help='time budget of every case')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark.json')
+    parser.add_argument('--compare', metavar='JSON',
+                        help='earlier results to compare throughput against')
+    args = parser.parse_args(argv)
+
+    results, flags = run_benchmarks(args.strategies, args.arms, args.turns,
+                                    args.max_seconds, args.seed)
+    with open(args.output, 'w') as handle:
+        json.dump({'meta': {'python': platform.python_version(),
+                            'numpy': np.__version__,
+                            'machine': platform.platform(),
+                            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                            'max_seconds': args.max_seconds,
+                            'seed': args.seed},
+                   'results': results, 'flags': flags}, handle, indent=2)
+    for flag in flags:
+        print('FLAG', flag)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
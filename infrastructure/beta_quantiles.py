@@ -0,0 +1,133 @@
+"""
+Memoised quantiles of Beta distributions.
+
+Bayes-UCB-style strategies, e.g. greedy_bayesian_bernoulli, need the
+q-quantile of every Beta(a, b) posterior they reach. The posteriors of
+Bernoulli arms with integer priors only take integer (a, b) states, which
+repeat across turns and replicates, so quantiles are served from:
+
+    a table     q-quantiles for all 1 <= a, b <= bound, computed for every q
+                on first use, or loaded from an .npy file in directory
+    a memo      the least recently used (q, a, b) entries beyond the table
+    betaincinv  for the rest; it returns the same values as
+                scipy.stats.beta.ppf without its per-call overhead
+
+Example
+-------
+    quantiles = BetaQuantiles(bound=1000, directory='.bandit_cache')
+    upper = quantiles.ppf(0.95, 12, 30)
+
+beta_ppf uses a shared instance, with a table of 256 x 256 states saved in
+$BANDIT_CACHE when that is set.
+"""
+
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+
+class BetaQuantiles:
+    """
+    Quantile service for Beta distributions.
+
+    Parameters
+    ----------
+        bound : int
+            Largest a and b of the tables, 0 for no tables
+        directory : str
+            Directory the tables are loaded from and saved to, None to keep
+            them in memory only
+        maxsize : int
+            Number of (q, a, b) entries kept in the memo
+
+    Attributes
+    ----------
+        hits, misses : int
+            Number of quantiles served from the table or memo and computed
+    """
+
+    def __init__(self, bound=0, directory=None, maxsize=2**16):
+        self.bound = bound
+        self.directory = directory
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._tables = {}
+        self._memo = OrderedDict()
+
+    def table(self, q):
+        """
+        Returns the array of q-quantiles of Beta(a, b) at [a - 1, b - 1] for
+        1 <= a, b <= bound.
+        """
+        if q not in self._tables:
+            path = None
+            if self.directory is not None:
+                path = os.path.join(self.directory,
+                                    f'beta_ppf_{q!r}_{self.bound}.npy')
+            if path is not None and os.path.exists(path):
+                table = np.load(path)
+            else:
+                from scipy.special import betaincinv
+
+                states = np.arange(1, self.bound + 1)
+                table = betaincinv(states[:, None], states[None, :], q)
+                if path is not None:
+                    os.makedirs(self.directory, exist_ok=True)
+                    # written under a temporary name so that concurrent
+                    # workers never load a partial table
+                    temporary = f'{path}.{os.getpid()}.tmp.npy'
+                    np.save(temporary, table)
+                    os.replace(temporary, path)
+            self._tables[q] = table
+        return self._tables[q]
+
+    def ppf(self, q, a, b):
+        """
+        Returns the q-quantile of Beta(a, b).
+        """
+        if (1 <= a <= self.bound and 1 <= b <= self.bound
+                and a == int(a) and b == int(b)):
+            self.hits += 1
+            return self.table(q)[int(a) - 1, int(b) - 1]
+        key = (q, a, b)
+        memo = self._memo
+        if key in memo:
+            memo.move_to_end(key)
+            self.hits += 1
+            return memo[key]
+        from scipy.special import betaincinv
+
+        self.misses += 1
+        value = memo[key] = betaincinv(a, b, q)
+        if len(memo) > self.maxsize:
+            memo.popitem(last=False)
+        return value
+
+    def clear(self):
+        """
+        Empties the memo; tables are kept.
+        """
+        self._memo.clear()
+
+
+_shared = None
+
+
+def shared_quantiles():
+    """
+    Returns the BetaQuantiles shared by the strategies of this process.
+    """
+    global _shared
+    if _shared is None:
+        _shared = BetaQuantiles(bound=256,
+                                directory=os.environ.get('BANDIT_CACHE'))
+    return _shared
+
+
+def beta_ppf(q, a, b):
+    """
+    Returns the q-quantile of Beta(a, b) from the shared BetaQuantiles.
+    """
+    return shared_quantiles().ppf(q, a, b)
@@ -0,0 +1,282 @@
+"""
+Content-addressed on-disk cache of simulation results.
+
+Experiments are keyed by a SHA-256 hash of everything that determines
+their result: the strategy (class or factory and its constructor
+arguments), the machine specifications, the horizon, the number of
+replicates, the output and the RNG seed. The source of the modules
+defining the strategy is part of the key, together with the modules of
+this directory they use (e.g. ucb_index, beta_quantiles, weighted_sampler)
+and the strategy modules a factory names through strategies.get_strategy,
+so editing a strategy or one of its helpers invalidates its entries.
+Results are pickled into one file per key; reading an entry refreshes its
+modification time and the least recently used entries are evicted once
+the cache exceeds its byte budget. An unreadable entry is removed and
+counted as a miss.
+
+Example
+-------
+    cache = ResultCache(budget=2**30)
+    regrets = run_replicates(ThompsonSamplingBernoulli_factory, machines,
+                             5000, 100, seed=0, cache=cache)
+    final_regret = cache.simulate(UCB_factory, machines, 1000, seed=3)
+    print(cache.hits, cache.misses)
+"""
+
+import hashlib
+import importlib
+import inspect
+import os
+import pickle
+import sys
+from functools import partial
+
+import numpy as np
+from infrastructure import Machine
+
+
+def describe(value):
+    """
+    Returns a canonical, hashable description of a value used in a cache
+    key. Classes and functions are described by their qualified name and
+    the source of their modules and of the helpers those use, partials by
+    their function and arguments, machines by their family and parameters.
+    """
+    if isinstance(value, partial):
+        return ('partial', describe(value.func), describe(value.args),
+                describe(value.keywords))
+    if isinstance(value, Machine):
+        if value.family is None:
+            raise TypeError("Machines without a family cannot be cached.")
+        return ('machine', value.family, describe(value.params))
+    if inspect.isclass(value):
+        return ('class', f'{value.__module__}.{value.__qualname__}',
+                tuple(_source(cls) for cls in value.__mro__
+                      if cls is not object),
+                _module_sources([cls.__module__ for cls in value.__mro__]))
+    if inspect.isfunction(value):
+        return ('function', f'{value.__module__}.{value.__qualname__}',
+                _source(value),
+                _module_sources([value.__module__]
+                                + _named_strategies(value.__code__)))
+    if inspect.isbuiltin(value):
+        return ('function', f'{value.__module__}.{value.__qualname__}',
+                _source(value))
+    if isinstance(value, dict):
+        return ('dict', tuple((describe(key), describe(item))
+                              for key, item in sorted(value.items())))
+    if isinstance(value, (list, tuple)):
+        return tuple(describe(item) for item in value)
+    if isinstance(value, np.ndarray):
+        return ('array', value.dtype.str, value.shape, value.tobytes())
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return value
+    raise TypeError(f"Cannot describe {type(value).__name__} in a cache key.")
+
+
+def digest(*parts):
+    """
+    Returns the SHA-256 hex digest of the description of parts.
+    """
+    return hashlib.sha256(repr(describe(parts)).encode()).hexdigest()
+
+
+def _source(obj):
+    try:
+        return inspect.getsource(obj)
+    except (OSError, TypeError):
+        return None
+
+
+_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def _is_local(module):
+    path = getattr(module, '__file__', None)
+    return (path is not None
+            and os.path.dirname(os.path.abspath(path)) == _DIRECTORY)
+
+
+def _module_sources(names):
+    """
+    Returns (name, source) of the modules of this directory among names and
+    of every module of this directory they use, found through their global
+    names, sorted by name.
+    """
+    sources = {}
+    pending = list(names)
+    while pending:
+        module = sys.modules.get(pending.pop())
+        if (module is None or module.__name__ in sources
+                or not _is_local(module)):
+            continue
+        sources[module.__name__] = _source(module)
+        for value in list(vars(module).values()):
+            if inspect.ismodule(value):
+                pending.append(value.__name__)
+            elif inspect.isclass(value) or inspect.isfunction(value):
+                pending.append(value.__module__)
+    return tuple(sorted(sources.items()))
+
+
+def _named_strategies(code):
+    """
+    Returns the modules of the strategies a function names by a string
+    constant, as factories calling strategies.get_strategy do, imported.
+    """
+    from strategies import STRATEGY_MODULES
+
+    modules = []
+    for constant in code.co_consts:
+        if inspect.iscode(constant):
+            modules += _named_strategies(constant)
+        elif isinstance(constant, str) and constant in STRATEGY_MODULES:
+            module = importlib.import_module(STRATEGY_MODULES[constant])
+            modules.append(module.__name__)
+    return modules
+
+
+class ResultCache:
+    """
+    Least recently used cache of pickled results under a byte budget.
+
+    Parameters
+    ----------
+        path : str
+            Directory of the cache, $BANDIT_CACHE or .bandit_cache by
+            default
+        budget : int
+            Maximum total size of the entries in bytes
+
+    Attributes
+    ----------
+        hits, misses : int
+            Number of lookups served from and missing from the cache
+    """
+
+    def __init__(self, path=None, budget=2**30):
+        if path is None:
+            path = os.environ.get('BANDIT_CACHE', '.bandit_cache')
+        self.path = path
+        self.budget = budget
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(path, exist_ok=True)
+
+    def key(self, *parts):
+        """
+        Returns the hex digest identifying an experiment described by parts.
+        """
+        return digest(*parts)
+
+    def _file(self, key):
+        return os.path.join(self.path, f'{key}.pkl')
+
+    def get(self, key, default=None):
+        """
+        Returns the value stored under key, or default on a miss. An entry
+        that cannot be unpickled, e.g. one truncated by a crash, is removed
+        and counted as a miss.
+        """
+        try:
+            with open(self._file(key), 'rb') as handle:
+                value = pickle.load(handle)
+        except FileNotFoundError:
+            self.misses += 1
+            return default
+        except (EOFError, pickle.UnpicklingError):
+            try:
+                os.remove(self._file(key))
+            except FileNotFoundError:
+                pass
+            self.misses += 1
+            return default
+        # mark as recently used
+        os.utime(self._file(key))
+        self.hits += 1
+        return value
+
+    def __contains__(self, key):
+        return os.path.exists(self._file(key))
+
+    def put(self, key, value):
+        """
+        Stores value under key and evicts least recently used entries
+        until the cache fits its budget again.
+        """
+        temporary = self._file(key) + '.tmp'
+        with open(temporary, 'wb') as handle:
+            pickle.dump(value, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, self._file(key))
+        self.evict(keep=key)
+
+    def entries(self):
+        """
+        Returns (mtime, size, key) of every entry, least recently used
+        first.
+        """
+        entries = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith('.pkl'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.name[:-4]))
+        return sorted(entries)
+
+    def size(self):
+        """
+        Returns the total size of the entries in bytes.
+        """
+        return sum(size for mtime, size, key in self.entries())
+
+    def evict(self, keep=None):
+        """
+        Removes least recently used entries, except keep, while the cache
+        exceeds its budget.
+        """
+        entries = self.entries()
+        total = sum(size for mtime, size, key in entries)
+        for mtime, size, key in entries:
+            if total <= self.budget:
+                break
+            if key == keep:
+                continue
+            try:
+                os.remove(self._file(key))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """
+        Removes every entry.
+        """
+        for mtime, size, key in self.entries():
+            os.remove(self._file(key))
+
+    def cached(self, function, *parts):
+        """
+        Returns the value stored under the key of parts, or calls function()
+        and stores its result.
+        """
+        key = self.key(*parts)
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = function()
+            self.put(key, value)
+        return value
+
+    def simulate(self, factory, machines, turns, seed, output='regret'):
+        """
+        Plays one game of factory(turns, *machines) seeded from seed and
+        returns game.simulate(output), from the cache when possible.
+        """
+        from runner import run_replicates
+
+        return run_replicates(factory, machines, turns, 1, output=output,
+                              seed=seed, workers=1, progress=None,
+                              cache=self)[0]
+
+
+_MISSING = object()
@@ -1,26 +1,41 @@
 from infrastructure import *
-import numpy as np
-import matplotlib.pyplot as plt
 from random import choices
+from ucb_index import IndexTree
 
 machines = [bernoulli_machine(i) for i in [0.33, 0.55, 0.6]]
 
 class epsilon_greedy(Game):
+    """
+    Epsilon-greedy: after one round of every machine, a uniformly random
+    machine is played with probability epsilon and the machine with the
+    largest mean otherwise.
+
+    The largest mean is kept by a ucb_index.IndexTree over lines of width 0,
+    so finding it after a turn costs O(log K) instead of an O(K) np.argmax;
+    ties still go to the lowest machine.
+    """
     def __init__(self, turns, *machines, epsilon=0.5):
         super().__init__(turns, *machines)
         self.epsilon = epsilon
+        self.mean_tree = IndexTree(self.machine_count, self.mean, self._line)
+        self.mean_tree.build(0.0)
+
+    def _line(self, i):
+        return self.means[i], 0.0
 
     def decide(self):
         if self.next_turn <= self.machine_count:
             return self.next_turn % self.machine_count
         exploit = choices([0,1],[self.epsilon,1-self.epsilon])[0]
         if exploit == 1: 
-            return np.argmax(self.means)
+            return self.mean_tree.best
         return choices(range(self.machine_count))[0]
 
     def _update(self,index,outcome):
         super()._update(index,outcome)
+        self.mean_tree.update(index, 0.0)
 
-obj5 = epsilon_greedy(100, *machines, epsilon = 0.5)
-print(obj5.simulate()/100)
+if __name__ == '__main__':
+    obj5 = epsilon_greedy(100, *machines, epsilon = 0.5)
+    print(obj5.simulate()/100)
 
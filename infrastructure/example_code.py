@@ -19,18 +19,18 @@ class AlwaysPickFirst(Game):
         return 0
 
 
-# simulate once
-g = AlwaysPickFirst(100, *machines)
-print(f"The wealth and regret of simulating the scenario once is"
-      f" {g.simulate('all')}.")
-
-
 def simulate_n_times(n, obj, turns, *machines):
     return [obj(turns, *machines).simulate() for i in range(n)]
 
 
-# simulate 1000 times
-k = 1000
-output = simulate_n_times(k, AlwaysPickFirst, 100, *machines)
-mean = sum(output) / k
-print(f"The mean outcome of simulating the scenario {k} times is {mean}.")
+if __name__ == '__main__':
+    # simulate once
+    g = AlwaysPickFirst(100, *machines)
+    print(f"The wealth and regret of simulating the scenario once is"
+          f" {g.simulate('all')}.")
+
+    # simulate 1000 times
+    k = 1000
+    output = simulate_n_times(k, AlwaysPickFirst, 100, *machines)
+    mean = sum(output) / k
+    print(f"The mean outcome of simulating the scenario {k} times is {mean}.")
@@ -29,17 +29,17 @@ class ExploreExploit(Game):
         return index_max
 
 
-p, turns, times = 0.5, 50, 1000
-# simulate once
-g = ExploreExploit(p, turns, *machines)
-print(f"The output of simulating the scenario once is {g.simulate()}.")
-
-
 def simulate_n_times(n, p, obj, turns, *machines):
     return [obj(p, turns, *machines).simulate() for i in range(n)]
 
 
-# simulate 1000 times
-output = simulate_n_times(times, 0.5, ExploreExploit, 50, *machines)
-mean = sum(output) / times
-print(f"The mean outcome of simulating the scenario {times} times is {mean}.")
+if __name__ == '__main__':
+    p, turns, times = 0.5, 50, 1000
+    # simulate once
+    g = ExploreExploit(p, turns, *machines)
+    print(f"The output of simulating the scenario once is {g.simulate()}.")
+
+    # simulate 1000 times
+    output = simulate_n_times(times, 0.5, ExploreExploit, 50, *machines)
+    mean = sum(output) / times
+    print(f"The mean outcome of simulating the scenario {times} times is {mean}.")
@@ -28,20 +28,21 @@ machines = [bernoulli_machine(i) for i in [0.2, 0.4, 0.6]]
 
 # create a class representing the scenario
 class BernoulliScenario(Game):
-    def __init__(self):
-        super().__init__(turns, *machines)
+    def __init__(self, *args):
+        # the scenario above unless turns and machines are given
+        super().__init__(*(args or (turns, *machines)))
 
 
 # modify init, _update to store variance
 # also overwrite decide
 class HighestVariance(BernoulliScenario):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, *args):
+        super().__init__(*args)
         self.vars = [0] * self.machine_count
 
     def _update(self, index, outcome):
         super()._update(index, outcome)
-        self.vars[index] = np.var(self.history[index])
+        self.vars[index] = self.variance(index)
 
     def decide(self):
         while self.next_turn <= self.turns * 0.5:
@@ -52,13 +53,13 @@ class HighestVariance(BernoulliScenario):
 
 
 class LowestVariance(BernoulliScenario):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, *args):
+        super().__init__(*args)
         self.vars = [0] * self.machine_count
 
     def _update(self, index, outcome):
         super()._update(index, outcome)
-        self.vars[index] = np.var(self.history[index])
+        self.vars[index] = self.variance(index)
 
     def decide(self):
         while self.next_turn <= self.turns * 0.5:
@@ -68,12 +69,13 @@ class LowestVariance(BernoulliScenario):
         return index_min
 
 
-times = 100
-hv = [HighestVariance().simulate() for i in range(times)]
-lv = [LowestVariance().simulate() for i in range(times)]
+if __name__ == '__main__':
+    times = 100
+    hv = [HighestVariance().simulate() for i in range(times)]
+    lv = [LowestVariance().simulate() for i in range(times)]
 
-print(f"The mean outcome of simulating the scenario {times} times "
-      f"picking highest variance is {np.mean(hv)}.")
+    print(f"The mean outcome of simulating the scenario {times} times "
+          f"picking highest variance is {np.mean(hv)}.")
 
-print(f"The mean outcome of simulating the scenario {times} times "
-      f"picking lowest variance is {np.mean(lv)}.")
+    print(f"The mean outcome of simulating the scenario {times} times "
+          f"picking lowest variance is {np.mean(lv)}.")
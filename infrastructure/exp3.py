@@ -0,0 +1,252 @@
+"""
+Exp3: exponential weights for exploration and exploitation.
+
+The strategies share ExponentialWeights, which keeps the log-weights in
+float64 and the weights exp(log_weight - shift) relative to a shift in a
+weighted_sampler.WeightedSampler. Pulling an arm changes one log-weight, so
+a turn updates one weight and draws the next arm in O(log K); the shift is
+moved to the largest log-weight, and every weight recomputed, only when a
+weight drifts RESCALE away from it, so the weights neither overflow nor
+underflow however long the horizon. The sampler sums its tree again every
+refresh_every updates so that rounding errors do not accumulate.
+
+    Exp3    Auer et al. (2002), rewards in [0, 1]
+    Exp3IX  Neu (2015), implicit exploration on loss estimates
+    Exp3P   Auer et al. (2002), high probability bounds; its bonus moves
+            every weight, so its turns cost O(K) (vectorised)
+
+RiggedGame is the former name of Exp3.
+"""
+
+from infrastructure import *
+from math import sqrt, log, exp
+from random import random
+from weighted_sampler import WeightedSampler
+
+
+class ExponentialWeights:
+    """
+    Weights exp(log_weight_i) of count arms, kept relative to a shift.
+
+    Parameters
+    ----------
+        count : int
+            Number of arms
+        refresh_every : int
+            Number of single-arm updates after which the weights are summed
+            again, max(count, 1024) by default
+
+    Attributes
+    ----------
+        log_weights : ndarray
+            float64 log-weights
+        weights : ndarray
+            exp(log_weights - shift)
+        sampler : WeightedSampler
+            Draws arms in proportion to the weights
+        total : float
+            Sum of weights
+        refreshes : int
+            Number of times every weight was recomputed
+    """
+
+    RESCALE = 32.0
+
+    def __init__(self, count, refresh_every=None):
+        self.log_weights = np.zeros(count)
+        self.shift = 0.0
+        self.sampler = WeightedSampler(np.ones(count),
+                                       rebuild_every=refresh_every)
+        self.updates = 0
+        self.refreshes = 0
+
+    @property
+    def weights(self):
+        return self.sampler.weights
+
+    @property
+    def total(self):
+        return self.sampler.total
+
+    def refresh(self):
+        """
+        Moves the shift to the largest log-weight and recomputes every
+        weight and the total.
+        """
+        self.shift = float(self.log_weights.max())
+        self.sampler = WeightedSampler(np.exp(self.log_weights - self.shift),
+                                       rebuild_every=self.sampler.rebuild_every)
+        self.refreshes += 1
+
+    def add(self, arm, amount):
+        """
+        Adds amount to the log-weight of arm.
+        """
+        self.log_weights[arm] += amount
+        exponent = self.log_weights[arm] - self.shift
+        if exponent > self.RESCALE:
+            self.refresh()
+            return
+        self.sampler.update(arm, exp(exponent))
+        self.updates += 1
+        if self.total < exp(-self.RESCALE):
+            self.refresh()
+
+    def add_all(self, amounts):
+        """
+        Adds an array of amounts to the log-weights of all the arms.
+        """
+        self.log_weights += amounts
+        self.refresh()
+
+    def probability(self, arm):
+        """
+        Returns the weight of arm relative to the total.
+        """
+        return self.weights[arm] / self.total
+
+    def probabilities(self):
+        """
+        Returns the weights relative to the total.
+        """
+        return self.weights / self.total
+
+    def sample(self, u):
+        """
+        Returns the arm whose weight interval contains u * total, for u
+        uniform on [0, 1), in O(log K).
+        """
+        return self.sampler.sample(u)
+
+
+class Exp3(Game):
+    """
+    Exp3 with exploration rate gamma: arm i is played with probability
+    (1 - gamma) w_i / W + gamma / K and its log-weight grows by
+    gamma / K * reward / probability.
+
+    Parameters
+    ----------
+        turns : int
+            Number of turns to be played
+        *machines : list
+            List of Machines, with rewards in [0, 1]
+        gamma : float
+            Exploration rate, min(1, sqrt(K log K / ((e - 1) turns))) by
+            default
+    """
+
+    def __init__(self, turns, *machines, gamma=None):
+        super().__init__(turns, *machines)
+        if gamma is None:
+            gamma = min([1,
+                         sqrt((self.machine_count*log(self.machine_count)/((exp(1)-1)*self.turns)))])
+        self.gamma = gamma
+        self.eta = self.gamma/self.machine_count
+        self.exponential_weights = ExponentialWeights(self.machine_count)
+        self.probability = None
+
+    def mixed_probability(self, arm):
+        """
+        Returns the probability of playing arm this turn.
+        """
+        return ((1-self.gamma)*self.exponential_weights.probability(arm)
+                + self.gamma/self.machine_count)
+
+    def decide(self):
+        # one uniform picks the uniform or the weighted component and the arm
+        draw = random()
+        if draw < self.gamma:
+            arm = min(int(draw/self.gamma*self.machine_count),
+                      self.machine_count - 1)
+        else:
+            arm = self.exponential_weights.sample(
+                (draw - self.gamma)/(1 - self.gamma))
+        self.probability = self.mixed_probability(arm)
+        return arm
+
+    def _update(self, index, outcome):
+        super()._update(index, outcome)
+        self.exponential_weights.add(index, self.eta*outcome/self.probability)
+
+
+# former name
+RiggedGame = Exp3
+
+
+class Exp3IX(Game):
+    """
+    Exp3-IX: arm i is played with probability w_i / W, and its log-weight
+    falls by eta * loss / (probability + gamma), with loss = 1 - reward.
+
+    Parameters
+    ----------
+        turns : int
+            Number of turns to be played
+        *machines : list
+            List of Machines, with rewards in [0, 1]
+        eta : float
+            Learning rate, sqrt(2 log K / (K turns)) by default
+        gamma : float
+            Implicit exploration, eta / 2 by default
+    """
+
+    def __init__(self, turns, *machines, eta=None, gamma=None):
+        super().__init__(turns, *machines)
+        if eta is None:
+            eta = sqrt(2*log(self.machine_count)/(self.machine_count*self.turns))
+        self.eta = eta
+        self.gamma = eta/2 if gamma is None else gamma
+        self.exponential_weights = ExponentialWeights(self.machine_count)
+        self.probability = None
+
+    def decide(self):
+        arm = self.exponential_weights.sample(random())
+        self.probability = self.exponential_weights.probability(arm)
+        return arm
+
+    def _update(self, index, outcome):
+        super()._update(index, outcome)
+        self.exponential_weights.add(
+            index, -self.eta*(1 - outcome)/(self.probability + self.gamma))
+
+
+class Exp3P(Exp3):
+    """
+    Exp3.P: Exp3 whose log-weights all grow by
+    gamma / (3K) * alpha / (probability sqrt(K turns)) every turn, on top of
+    gamma / (3K) * reward / probability for the arm played.
+
+    Parameters
+    ----------
+        turns : int
+            Number of turns to be played
+        *machines : list
+            List of Machines, with rewards in [0, 1]
+        delta : float
+            Confidence level of the regret bound
+        alpha : float
+            Bonus scale, 2 sqrt(log(K turns / delta)) by default
+        gamma : float
+            Exploration rate, min(3/5, 2 sqrt(3/5 K log K / turns)) by
+            default
+    """
+
+    def __init__(self, turns, *machines, delta=0.05, alpha=None, gamma=None):
+        K = len(machines)
+        if gamma is None:
+            gamma = min(3/5, 2*sqrt(3/5*K*log(K)/turns))
+        super().__init__(turns, *machines, gamma=gamma)
+        if alpha is None:
+            alpha = 2*sqrt(log(K*turns/delta))
+        self.alpha = alpha
+        self.eta = self.gamma/(3*self.machine_count)
+
+    def _update(self, index, outcome):
+        # skips the learning step of Exp3, not the rest of the MRO
+        super(Exp3, self)._update(index, outcome)
+        probabilities = ((1-self.gamma)*self.exponential_weights.probabilities()
+                         + self.gamma/self.machine_count)
+        amounts = self.eta*self.alpha/(probabilities*sqrt(self.machine_count*self.turns))
+        amounts[index] += self.eta*outcome/self.probability
+        self.exponential_weights.add_all(amounts)
@@ -11,9 +11,8 @@ Thompson Sampling.
 """
 
 from infrastructure import *  # noqa: F403
+from beta_quantiles import beta_ppf
 import numpy as np
-from scipy.stats import beta
-import matplotlib.pyplot as plt
 from copy import copy, deepcopy
 import random
 
@@ -25,7 +24,8 @@ priors = [[1, 1] for i in range(len(machines))]
 class GreedyBayesianBernoulli(Game):  # noqa: F405
     """Greedy Bayesian using beta prior."""
 
-    def __init__(self, prior_parameters, threshold, ucb, turns, *machines):
+    def __init__(self, prior_parameters, threshold, ucb, turns, *machines,
+                 record_posteriors=False):
         """
         We define additional attributes to implement this method.
 
@@ -40,14 +40,22 @@ class GreedyBayesianBernoulli(Game):  # noqa: F405
                             instead of exploiting at each step. Pass in
                             0 to make the method purely greedy.
         self.ucb            the upper confidence percentile of the
-                            parameter - calculated at each time step
-                            from the prior
+                            parameter
+        self.pre_ucb        the ucb percentile of every machine's
+                            posterior; only the machine played is updated
+                            after an outcome, from the shared memo of
+                            beta_quantiles
+        record_posteriors   keep post_parameters_history (None otherwise)
         """
         super().__init__(turns, *machines)  # inherit class attributes
         self.parameters = copy([copy(sublist) for sublist in prior_parameters])
-        self.post_parameters_history = [deepcopy(prior_parameters)]
+        self.post_parameters_history = None
+        if record_posteriors:
+            self.post_parameters_history = [deepcopy(prior_parameters)]
         self.threshold = threshold
         self.ucb = ucb
+        self.pre_ucb = [beta_ppf(self.ucb, para[0], para[1])
+                        for para in self.parameters]
 
     def _update(self, index, outcome):  # need to overwrite update for Bayesian
         super()._update(index, outcome)
@@ -58,25 +66,26 @@ class GreedyBayesianBernoulli(Game):  # noqa: F405
         else:
             self.parameters[index][1] += 1
 
+        # only the percentile of the machine played changes
+        para = self.parameters[index]
+        self.pre_ucb[index] = beta_ppf(self.ucb, para[0], para[1])
+
         # update history
-        self.post_parameters_history.append(deepcopy(self.parameters))
+        if self.post_parameters_history is not None:
+            self.post_parameters_history.append(deepcopy(self.parameters))
 
     def decide(self):  # the decision-making step based on the current model
         e = random.uniform(0, 1)  # used later for exploitation/exploration
         # pre_mean = [beta[0] / (beta[0] + beta[1])  # noqa: F841
         #             for beta in self.parameters]
 
-        # compute the UCB for each machine given the user-input percentile
-        pre_ucb = [beta.ppf(self.ucb, para[0], para[1], loc=0, scale=1)
-                   for para in self.parameters]  # from scipy.stats
-
         # decide: exploit the best option (UCB)/explore another random machine
         if e > self.threshold:
-            decision_index = np.argmax(pre_ucb)
+            decision_index = np.argmax(self.pre_ucb)
         else:
             # can improve on code readability
-            index = [i for i, _ in enumerate(machines)]
-            index.pop(np.argmax(pre_ucb))
+            index = list(range(self.machine_count))
+            index.pop(np.argmax(self.pre_ucb))
             decision_index = random.choice(index)
 
         return decision_index
@@ -84,27 +93,34 @@ class GreedyBayesianBernoulli(Game):  # noqa: F405
 
 # define a plotting template for a beta pdf
 def plot_beta_pdf(ax, a, b):
+    from scipy.stats import beta
+
     x = np.linspace(0.01, 0.99, 99)
     ax.plot(x, beta(a, b).pdf(x))
 
 
-# simulate for 1000 turns
-turns = 1000
-# example in git repo passes a 0.02 chance of random exploration with
-# exploitation determined by the 90% upper bound
-g = GreedyBayesianBernoulli(priors, 0.02, 0.95, turns, *machines)
-g.simulate()
+if __name__ == '__main__':
+    import matplotlib.pyplot as plt
+
+    # simulate for 1000 turns
+    turns = 1000
+    # example in git repo passes a 0.02 chance of random exploration with
+    # exploitation determined by the 90% upper bound
+    g = GreedyBayesianBernoulli(priors, 0.02, 0.95, turns, *machines,
+                                record_posteriors=True)
+    g.simulate()
 
-# generate and fill out the plot
-fig, ax = plt.subplots(len(machines) + 1, figsize=(5, 10))
+    # generate and fill out the plot
+    fig, ax = plt.subplots(len(machines) + 1, figsize=(5, 10))
 
-for i in [10, 100, 1000]:
-    for j in range(len(machines)):
-        a, b = g.post_parameters_history[i][j]
-        plot_beta_pdf(ax[j], a, b)
+    for i in [10, 100, 1000]:
+        for j in range(len(machines)):
+            a, b = g.post_parameters_history[i][j]
+            plot_beta_pdf(ax[j], a, b)
 
-# add in a plot of the decision history - note that this is only implicative
-# of regret
-ax[-1].plot(g.decision_history, marker='.', markersize=2, linestyle="None")
+    # add in a plot of the decision history - note that this is only
+    # implicative of regret
+    ax[-1].plot(g.decision_history, marker='.', markersize=2,
+                linestyle="None")
 
-plt.show()
+    plt.show()
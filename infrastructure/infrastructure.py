@@ -1,6 +1,167 @@
 from platform import machine
+import numbers
 import numpy as np
-from random import choices, randint, random
+from random import choices
+
+# number of outcomes a machine draws at once when its buffer runs out
+DEFAULT_BUFFER_SIZE = 4096
+
+
+def _bernoulli_block(n, p):
+    return (np.random.random_sample(n) < p).astype(int)
+
+
+def _normal_block(n, mean, sd):
+    return np.random.normal(mean, sd, n)
+
+
+# functions drawing n outcomes of a distribution family in one call
+BLOCK_SAMPLERS = {'bernoulli': _bernoulli_block, 'normal': _normal_block}
+
+
+def _normal_quantile(u, mean, sd):
+    from scipy.special import ndtri
+    return mean + sd * ndtri(u)
+
+
+# functions turning an array of uniforms into outcomes of a family
+INVERSE_CDFS = {'bernoulli': lambda u, p: (u < p).astype(int),
+                'normal': _normal_quantile}
+
+
+def _restore(obj, state, defaults):
+    """
+    Sets the pickled state of an object with __slots__. Accepts the
+    (dict, slots) pair pickle produces for such objects as well as the plain
+    dict of objects pickled before the class had __slots__; attributes
+    missing from older pickles take their value from defaults.
+    """
+    if isinstance(state, tuple):
+        state = {**(state[0] or {}), **state[1]}
+    for name, value in {**defaults, **state}.items():
+        setattr(obj, name, value)
+
+
+def decision_dtype(machine_count):
+    """
+    Returns the smallest unsigned integer type able to hold a machine index.
+    """
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if machine_count <= np.iinfo(dtype).max + 1:
+            return dtype
+    return np.uint64
+
+
+def checkpoint_grid(turns, checkpoints):
+    """
+    Returns the sorted array of turns at which the regret is recorded,
+    always including turn 0 and the final turn.
+
+    Parameters:
+    -----------
+    turns:
+        total number of turns
+    checkpoints:
+        None; every turn (returns None)
+        int k; every k turns
+        'log' or ('log', n); about n (default 100) log-spaced turns
+        an iterable of ints; exactly those turns
+    """
+    if checkpoints is None:
+        return None
+    if isinstance(checkpoints, numbers.Integral):
+        if checkpoints < 1:
+            raise ValueError("The checkpoint interval must be at least 1.")
+        grid = np.arange(0, turns + 1, int(checkpoints))
+    elif (isinstance(checkpoints, str)
+          or (isinstance(checkpoints, tuple) and len(checkpoints) == 2
+              and isinstance(checkpoints[0], str))):
+        if checkpoints[0] != 'log' and checkpoints != 'log':
+            raise ValueError(f"Unknown checkpoints {checkpoints!r}.")
+        n = 100 if checkpoints == 'log' else checkpoints[1]
+        if not isinstance(n, numbers.Integral) or n < 1:
+            raise ValueError("The number of log-spaced checkpoints must be "
+                             "an integer of at least 1.")
+        grid = np.round(np.geomspace(1, max(turns, 1), int(n)))
+    else:
+        grid = np.asarray(list(checkpoints))
+    grid = np.concatenate(([0], grid, [turns])).astype(np.int64)
+    return np.unique(grid[(grid >= 0) & (grid <= turns)])
+
+
+class TurnBuffer:
+    """
+    A preallocated typed array which is filled one value per turn.
+    Behaves like a read-only sequence of the values appended so far
+    (len, indexing, iteration and np.array all work as for a list).
+    """
+    __slots__ = ('_data', '_size')
+
+    def __init__(self, capacity, dtype, initial=()):
+        self._data = np.zeros(capacity, dtype=dtype)
+        self._size = 0
+        for value in initial:
+            self.append(value)
+
+    def append(self, value):
+        self._data[self._size] = value
+        self._size += 1
+
+    def view(self):
+        """
+        Returns a read-only array of the values appended so far.
+        """
+        view = self._data[:self._size]
+        view.flags.writeable = False
+        return view
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, key):
+        return self.view()[key]
+
+    def __iter__(self):
+        return iter(self.view())
+
+    def __array__(self, dtype=None, copy=None):
+        view = self.view()
+        return view if dtype is None else view.astype(dtype)
+
+
+class ArmHistory:
+    """
+    The outcome histories of all machines, stored in one typed array per
+    machine. Each array doubles in size when full. history[i] returns a
+    read-only array of the outcomes of machine i.
+    """
+    __slots__ = ('_data', '_counts')
+
+    def __init__(self, machine_count, dtype, capacity=64):
+        self._data = [np.zeros(capacity, dtype=dtype)
+                      for i in range(machine_count)]
+        self._counts = [0] * machine_count
+
+    def append(self, index, outcome):
+        data, n = self._data[index], self._counts[index]
+        if n == len(data):
+            data = self._data[index] = np.concatenate((data, np.zeros_like(data)))
+        data[n] = outcome
+        self._counts[index] = n + 1
+
+    def count(self, index):
+        return self._counts[index]
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getitem__(self, index):
+        view = self._data[index][:self._counts[index]]
+        view.flags.writeable = False
+        return view
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
 
 
 class Machine:
@@ -14,32 +175,118 @@ class Machine:
         mean of the distribution of the output
     var:
         var of the distribution of the output
+    family:
+        name of the distribution family (e.g. 'bernoulli', 'normal'),
+        None for machines built from an arbitrary func
+    params:
+        parameters of the distribution family, e.g. (p,) or (mean, sd)
+    buffer_size:
+        number of outcomes drawn at once for machines of a known family
+    uniforms:
+        optional callable returning the next n uniforms to turn into
+        outcomes (e.g. a reward_tape.TapeReader), instead of drawing
+        them from numpy's global RNG
     
     Methods:
     --------
     spin:
-        spin the machine by calling func, returning the output of the machine
+        spin the machine, returning the output of the machine. Machines of
+        a known family serve outcomes from a pre-generated block which is
+        refilled when it runs out; other machines call func
+    spin_many:
+        spin the machine n times, returning the outputs as an array
     """
-    def __init__(self, func, mean=None, var=None):
+    __slots__ = ('func', 'mean', 'var', 'family', 'params', 'buffer_size',
+                 'uniforms', '_buffer', '_position')
+
+    def __init__(self, func, mean=None, var=None, family=None, params=(),
+                 buffer_size=DEFAULT_BUFFER_SIZE, uniforms=None):
         self.func = func
         self.mean, self.var = mean, var
+        self.family, self.params = family, tuple(params)
+        self.buffer_size = buffer_size
+        self.uniforms = uniforms
+        self._buffer = []
+        self._position = 0
+
+    def _block(self, n):
+        """
+        Draws n fresh outcomes.
+        """
+        if self.uniforms is not None:
+            return INVERSE_CDFS[self.family](self.uniforms(n), *self.params)
+        sampler = BLOCK_SAMPLERS.get(self.family)
+        if sampler is None:
+            return np.array([self.func() for i in range(n)])
+        return sampler(n, *self.params)
 
     def spin(self):
-        return self.func()
+        if self.family not in BLOCK_SAMPLERS:
+            return self.func()
+        if self._position == len(self._buffer):
+            # tolist gives python scalars, which are faster to hand out
+            self._buffer = self._block(self.buffer_size).tolist()
+            self._position = 0
+        outcome = self._buffer[self._position]
+        self._position += 1
+        return outcome
+
+    def spin_many(self, n):
+        buffered = self._buffer[self._position:self._position + n]
+        self._position += len(buffered)
+        fresh = self._block(n - len(buffered))
+        if not buffered:
+            return fresh
+        return np.concatenate((np.array(buffered, dtype=fresh.dtype), fresh))
+
+    def __reduce_ex__(self, protocol):
+        # machines of a known family pickle as their specification, so they
+        # can be sent to worker processes (func is usually a lambda) and
+        # copies start with an empty buffer
+        if self.family in MACHINE_FACTORIES:
+            return (_rebuild_machine,
+                    (self.family, self.params, self.buffer_size,
+                     self.uniforms))
+        return super().__reduce_ex__(protocol)
 
+    def __setstate__(self, state):
+        _restore(self, state, {'family': None, 'params': (),
+                               'buffer_size': DEFAULT_BUFFER_SIZE,
+                               'uniforms': None, '_buffer': [],
+                               '_position': 0})
 
-def bernoulli_machine(p):
+
+def bernoulli_machine(p, buffer_size=DEFAULT_BUFFER_SIZE):
     """
     Returns a machine with Bernoulli payout.
     """
-    return Machine(lambda: choices([0, 1], [1-p, p])[0], p, p*(1-p))
+    return Machine(lambda: choices([0, 1], [1-p, p])[0], p, p*(1-p),
+                   family='bernoulli', params=(p,), buffer_size=buffer_size)
 
 
-def normal_machine(mean, sd):
+def normal_machine(mean, sd, buffer_size=DEFAULT_BUFFER_SIZE):
     """
     Returns a machine with normal payout.
     """
-    return Machine(lambda: np.random.normal(mean, sd), mean, sd**2)
+    return Machine(lambda: np.random.normal(mean, sd), mean, sd**2,
+                   family='normal', params=(mean, sd), buffer_size=buffer_size)
+
+
+MACHINE_FACTORIES = {'bernoulli': bernoulli_machine, 'normal': normal_machine}
+
+
+def machine_from_spec(family, *params):
+    """
+    Returns a machine from its specification, e.g. ('bernoulli', 0.3)
+    or ('normal', 0, 1).
+    """
+    return MACHINE_FACTORIES[family](*params)
+
+
+def _rebuild_machine(family, params, buffer_size, uniforms=None):
+    machine = MACHINE_FACTORIES[family](*params, buffer_size=buffer_size)
+    machine.uniforms = uniforms
+    return machine
 
 
 class Game:
@@ -60,27 +307,123 @@ class Game:
         a tuple containing the machines of the game
     means:
         a tuple of mean outcomes for each machine
+    counts:
+        a list of the number of times each machine has been played
+    sums:
+        a list of the total outcome of each machine
     wealth:
         self explanatory
     decision_history:
         a list of the decisions made for all turns (indicies of machines)
+    historical_regret:
+        a list of the regret after each turn, starting from 0
+
+    Storage
+    -------
+    history_storage:
+        class attribute choosing how the histories are stored. Set it on a
+        subclass to opt in to a different mode.
+        'list' (default); python lists as described above
+        'array'; preallocated typed NumPy buffers. decision_history is a
+        TurnBuffer of the smallest unsigned type holding a machine index,
+        historical_regret a float64 TurnBuffer and history an ArmHistory
+        (uint8 outcomes when every machine is Bernoulli, float64 otherwise).
+        All three give read-only arrays with the same indexing as the lists.
+        'stats'; no history at all, only the per-machine sufficient
+        statistics (counts, sums, running variances), so memory is O(K)
+        whatever the number of turns. history, decision_history and
+        historical_regret are None.
+
+    Strategies should read per-machine statistics through count, mean
+    and variance rather than from history, so that they work in every mode.
+
+    regret_checkpoints:
+        class attribute choosing the turns at which historical_regret is
+        recorded, in any form accepted by checkpoint_grid (e.g. 100 for
+        every 100 turns, ('log', 50) or [10, 100, 1000]). The default None
+        records every turn. Regret at the checkpoints is exact and the
+        final turn is always included; in 'stats' mode setting checkpoints
+        turns historical_regret back on. Use regret_curve to get the turns
+        along with the values.
     """
+    __slots__ = ('machine_count', 'history', 'turns', 'next_turn', 'machines',
+                 'means', 'counts', 'sums', '_m2', 'wealth',
+                 'decision_history', 'historical_regret', 'regret',
+                 'best_machine_mean', '_arrays', '_checkpoints',
+                 '_every_turn', '_pending_checkpoints', '_next_checkpoint')
+
+    history_storage = 'list'
+    regret_checkpoints = None
 
     def __init__(self, turns, *machines):
         self.machine_count = len(machines)
-        self.history = [[] for i in range(self.machine_count)]
         self.turns = turns
         self.next_turn = 1
         self.machines = machines
         self.means = [0]*self.machine_count
+        self.counts = [0]*self.machine_count
+        self.sums = [0]*self.machine_count
+        # sum of squared deviations from the mean (Welford)
+        self._m2 = [0]*self.machine_count
         self.wealth = 0
-        self.decision_history = []
-        self.historical_regret = [0]
         if all([m.mean is not None for m in machines]):
             self.regret = 0
             self.best_machine_mean = max([m.mean for m in machines])
         else:
             self.regret = None
+            self.best_machine_mean = None
+
+        if self.history_storage == 'list':
+            self._arrays = False
+            self.history = [[] for i in range(self.machine_count)]
+            self.decision_history = []
+            self.historical_regret = [0]
+        elif self.history_storage == 'array':
+            self._arrays = True
+            if all([m.family == 'bernoulli' for m in machines]):
+                outcome_dtype = np.uint8
+            else:
+                outcome_dtype = np.float64
+            self.history = ArmHistory(self.machine_count, outcome_dtype,
+                                      capacity=max(1, min(turns, 64)))
+            self.decision_history = TurnBuffer(
+                turns, decision_dtype(self.machine_count))
+            self.historical_regret = TurnBuffer(turns + 1, np.float64, [0])
+        elif self.history_storage == 'stats':
+            self._arrays = False
+            self.history = None
+            self.decision_history = None
+            self.historical_regret = None
+        else:
+            raise ValueError(f"Unknown history storage "
+                             f"{self.history_storage!r}.")
+
+        self._checkpoints = checkpoint_grid(turns, self.regret_checkpoints)
+        # without checkpoints the regret is appended every turn, as before
+        self._every_turn = (self._checkpoints is None
+                            and self.historical_regret is not None)
+        pending = ()
+        if self._checkpoints is not None:
+            if self._arrays:
+                self.historical_regret = TurnBuffer(len(self._checkpoints),
+                                                    np.float64, [0])
+            else:
+                self.historical_regret = [0]
+            if self.regret is not None:
+                pending = self._checkpoints[1:].tolist()
+        self._pending_checkpoints = iter(pending)
+        # turn at which the regret is next recorded, 0 once there is none
+        self._next_checkpoint = next(self._pending_checkpoints, 0)
+
+    def __setstate__(self, state):
+        _restore(self, state, {'best_machine_mean': None, '_arrays': False,
+                               '_checkpoints': None, '_every_turn': None,
+                               '_pending_checkpoints': iter(()),
+                               '_next_checkpoint': 0})
+        if self._every_turn is None:
+            # pickled before checkpoints: the regret was kept every turn
+            self._every_turn = (self._checkpoints is None
+                                and self.historical_regret is not None)
 
     def _update(self, index, outcome):
         """
@@ -88,24 +431,75 @@ class Game:
         Can be modified to include update new attributes
         (e.g. running variance).
         """
-        self.history[index].append(outcome)
-        l = len(self.history[index])
-        self.means[index] = (self.means[index] * (l-1) + outcome)/l
+        l = self.counts[index] + 1
+        self.counts[index] = l
+        self.sums[index] += outcome
+        mean = self.means[index]
+        self.means[index] = (mean * (l-1) + outcome)/l
+        self._m2[index] += (outcome - mean) * (outcome - self.means[index])
+        if self._arrays:
+            self.history.append(index, outcome)
+        elif self.history is not None:
+            self.history[index].append(outcome)
         self.wealth += outcome
         if self.regret is not None:
             self.regret += self.best_machine_mean - self.machines[index].mean
-            self.historical_regret.append(self.regret)
+            if self._every_turn:
+                self.historical_regret.append(self.regret)
+            elif self.next_turn == self._next_checkpoint:
+                self.historical_regret.append(self.regret)
+                self._next_checkpoint = next(self._pending_checkpoints, 0)
 
     def _step(self):
         """
         Progresses the game by one time step.
         """
         decision = self.decide()
-        self.decision_history.append(decision)
+        if self.decision_history is not None:
+            self.decision_history.append(decision)
         outcome = self.machines[decision].spin()
         self._update(decision, outcome)
         self.next_turn += 1
 
+    def count(self, index):
+        """
+        Returns the number of times machine index has been played.
+        """
+        return self.counts[index]
+
+    def mean(self, index):
+        """
+        Returns the mean outcome of machine index.
+        """
+        return self.means[index]
+
+    def variance(self, index):
+        """
+        Returns the (population) variance of the outcomes of machine index.
+        """
+        n = self.counts[index]
+        return self._m2[index] / n if n > 1 else 0.0
+
+    @classmethod
+    def instrumented(cls):
+        """
+        Returns a subclass of cls timing the phases of every turn, see
+        instrumentation.py. cls itself keeps its uninstrumented _step.
+        """
+        from instrumentation import instrumented
+
+        return instrumented(cls)
+
+    def regret_curve(self):
+        """
+        Returns the turns at which the regret has been recorded so far and
+        the regret at those turns, as two arrays.
+        """
+        values = np.asarray(self.historical_regret, dtype=float)
+        if self._checkpoints is None:
+            return np.arange(len(values)), values
+        return self._checkpoints[:len(values)], values
+
     def decide(self):
         """
         Makes a decision based on current game stage (i.e. attributes of self)
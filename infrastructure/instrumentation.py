@@ -0,0 +1,246 @@
+"""
+Opt-in instrumentation of games.
+
+Game._step carries no hooks or timers, so uninstrumented games pay nothing.
+instrumented(cls) returns a subclass of a strategy whose _step times its
+phases and calls hooks:
+
+    decide      the strategy's decide
+    spin        Machine.spin of the machine chosen
+    update      the whole _update chain, split into
+                game      the bookkeeping of Game._update
+                strategy  the work subclasses add around super()._update
+    other       decision history, hooks and the loop itself
+
+The split of update works by slotting a timed copy of Game._update between
+the strategy and Game in the method resolution order, so a strategy's
+super()._update call is timed without changing the strategy.
+
+Example
+-------
+    game = instrumented(UCB1_tuned)(5000, *machines)
+    game.instrumentation.on_update.append(lambda g, i, o: ...)
+    game.simulate()
+    print(report(game.instrumentation, 'UCB1_tuned'))
+
+For batch runs, instrument(factory) builds instrumented games from any
+factory and instrumentation_of collects the measurements of every game:
+
+    measurements = run_replicates(instrument(STRATEGIES['rpm']), machines,
+                                  5000, 20, output=instrumentation_of)
+    print(report(measurements, 'rpm'))
+"""
+
+import time
+
+from infrastructure import Game
+
+
+PHASES = ('decide', 'spin', 'update', 'game', 'other')
+
+
+class Instrumentation:
+    """
+    Cumulative measurements of one or more games.
+
+    Attributes
+    ----------
+        seconds : dict
+            Cumulative seconds spent in every phase of PHASES
+        turns : int
+            Number of turns played, i.e. of calls of decide, spin and
+            _update
+        game_updates : int
+            Number of calls of Game._update
+        pulls : list
+            Number of pulls of every arm
+        step_seconds : float
+            Cumulative seconds spent in _step
+        on_decide : list
+            Callbacks called as f(game, decision) after every decide
+        on_update : list
+            Callbacks called as f(game, index, outcome) after every _update
+    """
+
+    def __init__(self, machine_count=0, on_decide=(), on_update=()):
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.turns = 0
+        self.game_updates = 0
+        self.pulls = [0] * machine_count
+        self.step_seconds = 0.0
+        self.on_decide = list(on_decide)
+        self.on_update = list(on_update)
+
+    def __getstate__(self):
+        # callbacks are often lambdas; only the measurements are shipped
+        state = self.__dict__.copy()
+        state['on_decide'], state['on_update'] = [], []
+        return state
+
+    def merge(self, other):
+        """
+        Adds the measurements of another Instrumentation.
+        """
+        for phase in PHASES:
+            self.seconds[phase] += other.seconds[phase]
+        self.game_updates += other.game_updates
+        if len(other.pulls) > len(self.pulls):
+            self.pulls += [0] * (len(other.pulls) - len(self.pulls))
+        for i, pulls in enumerate(other.pulls):
+            self.pulls[i] += pulls
+        self.turns += other.turns
+        self.step_seconds += other.step_seconds
+        return self
+
+    def breakdown(self):
+        """
+        Returns the seconds of every phase, including the strategy part of
+        update (update minus the game bookkeeping).
+        """
+        seconds = dict(self.seconds)
+        seconds['strategy'] = seconds['update'] - seconds['game']
+        return seconds
+
+    def dominant(self):
+        """
+        Returns the phase taking the most time among decide, spin,
+        the game and strategy parts of update, and other.
+        """
+        seconds = self.breakdown()
+        return max(('decide', 'spin', 'game', 'strategy', 'other'),
+                   key=seconds.__getitem__)
+
+
+class _TimedUpdate(Game):
+    """
+    Placed between a strategy and Game in the MRO of an instrumented class
+    to time the bookkeeping of Game._update.
+    """
+
+    __slots__ = ()
+
+    def _update(self, index, outcome):
+        start = time.perf_counter()
+        Game._update(self, index, outcome)
+        instrumentation = self.instrumentation
+        instrumentation.seconds['game'] += time.perf_counter() - start
+        instrumentation.game_updates += 1
+
+
+def _instrumented_step(self):
+    clock = time.perf_counter
+    instrumentation = self.instrumentation
+    seconds = instrumentation.seconds
+    start = clock()
+    decision = self.decide()
+    decided = clock()
+    for hook in instrumentation.on_decide:
+        hook(self, decision)
+    if self.decision_history is not None:
+        self.decision_history.append(decision)
+    spin = clock()
+    outcome = self.machines[decision].spin()
+    spun = clock()
+    self._update(decision, outcome)
+    updated = clock()
+    for hook in instrumentation.on_update:
+        hook(self, decision, outcome)
+    self.next_turn += 1
+    end = clock()
+
+    seconds['decide'] += decided - start
+    seconds['spin'] += spun - spin
+    seconds['update'] += updated - spun
+    seconds['other'] += (end - start) - (decided - start) - (spun - spin) \
+        - (updated - spun)
+    instrumentation.step_seconds += end - start
+    instrumentation.turns += 1
+    instrumentation.pulls[decision] += 1
+
+
+_classes = {}
+
+
+def instrumented(cls):
+    """
+    Returns the instrumented subclass of a Game subclass. Instances have an
+    instrumentation attribute holding an Instrumentation.
+    """
+    if cls not in _classes:
+        def __init__(self, *args, **kwargs):
+            super(subclass, self).__init__(*args, **kwargs)
+            self.instrumentation = Instrumentation(self.machine_count)
+
+        bases = (_TimedUpdate,) if cls is Game else (cls, _TimedUpdate)
+        subclass = type(f'Instrumented{cls.__name__}', bases, {
+            '__init__': __init__,
+            '_step': _instrumented_step,
+            '__module__': cls.__module__,
+        })
+        _classes[cls] = subclass
+    return _classes[cls]
+
+
+def instrument_game(game, on_decide=(), on_update=()):
+    """
+    Turns an existing, not yet played game into an instrumented one and
+    returns it.
+    """
+    game.__class__ = instrumented(type(game))
+    game.instrumentation = Instrumentation(game.machine_count, on_decide,
+                                           on_update)
+    return game
+
+
+class instrument:
+    """
+    Wraps a game factory so that it builds instrumented games. Picklable
+    when the factory and callbacks are, so it can be passed to
+    runner.run_replicates.
+    """
+
+    def __init__(self, factory, on_decide=(), on_update=()):
+        self.factory = factory
+        self.on_decide = on_decide
+        self.on_update = on_update
+
+    def __call__(self, *args, **kwargs):
+        return instrument_game(self.factory(*args, **kwargs), self.on_decide,
+                               self.on_update)
+
+
+def instrumentation_of(game):
+    """
+    Output callable returning the Instrumentation of a finished game.
+    """
+    return game.instrumentation
+
+
+def report(instrumentations, name='strategy'):
+    """
+    Returns a text report of the time spent in every phase by one
+    Instrumentation or the merged measurements of a list of them.
+    """
+    if isinstance(instrumentations, Instrumentation):
+        instrumentations = [instrumentations]
+    total = Instrumentation()
+    for instrumentation in instrumentations:
+        total.merge(instrumentation)
+    seconds = total.breakdown()
+    calls = dict.fromkeys(seconds, total.turns)
+    calls['game'] = calls['strategy'] = total.game_updates
+    step = total.step_seconds or 1e-12
+    rate = total.turns / step
+    lines = [f"{name}: {total.turns} turns in {total.step_seconds:.3f} s "
+             f"({rate:.0f} turns/s)",
+             f"  {'phase':<12}{'seconds':>10}{'share':>8}{'calls':>10}"
+             f"{'us/call':>10}"]
+    for phase, indent in [('decide', 2), ('spin', 2), ('update', 2),
+                          ('game', 4), ('strategy', 4), ('other', 2)]:
+        per_call = seconds[phase] / calls[phase] * 1e6 if calls[phase] else 0
+        lines.append(f"{' ' * indent}{phase:<{14 - indent}}"
+                     f"{seconds[phase]:>10.3f}"
+                     f"{seconds[phase] / step:>8.1%}{calls[phase]:>10}"
+                     f"{per_call:>10.2f}")
+    lines.append(f"  dominant phase: {total.dominant()}")
+    return '\n'.join(lines)
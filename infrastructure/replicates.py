@@ -0,0 +1,282 @@
+"""
+Lockstep replicate engine.
+
+The experiment scripts run ``[Strategy(...).simulate("obj") for i in range(n)]``,
+i.e. n independent games each stepping one turn at a time in pure Python.
+A ReplicateGame instead advances R replicates of the same strategy together:
+the state of every replicate is held in R x K NumPy arrays and each turn
+draws all R rewards and makes all R decisions with a few vectorised calls.
+
+The scalar Game class stays the reference implementation. The strategies
+below follow the same turn conventions as their scalar counterparts
+(UCB_bernoulli, ThompsonSamplingBernoulli, epsilon_greedy) so that the
+distribution of their results can be checked against it.
+"""
+
+import numpy as np
+from infrastructure import checkpoint_grid, decision_dtype
+
+
+class ReplicateGame:
+    """A class to represent R replicates of the same game, played in lockstep.
+
+    Attributes
+    ----------
+    replicates:
+        number of replicates R
+    machine_count:
+        total number of machines K
+    turns:
+        total number of turns
+    next_turn:
+        turn number of next turn (shared by all replicates)
+    machines:
+        a tuple containing the machines of the game
+    rng:
+        numpy Generator used for both rewards and decisions
+    counts:
+        R x K array of the number of times each machine has been played
+    sums:
+        R x K array of the total outcome of each machine
+    means:
+        R x K array of mean outcomes for each machine
+    wealth:
+        array of length R
+    regret:
+        array of length R, None if some machine has no known mean
+    decision_history:
+        R x turns array of decisions, None if record_history is False
+    historical_regret:
+        R x (turns + 1) array of regret after each turn, None if
+        record_history is False or the regret is unknown. With
+        regret_checkpoints (see checkpoint_grid) it only holds one column
+        per checkpoint.
+    """
+
+    def __init__(self, replicates, turns, *machines, seed=None,
+                 record_history=True, regret_checkpoints=None):
+        self.replicates = replicates
+        self.machine_count = len(machines)
+        self.turns = turns
+        self.next_turn = 1
+        self.machines = machines
+        self.rng = np.random.default_rng(seed)
+
+        shape = (replicates, self.machine_count)
+        self.counts = np.zeros(shape, dtype=np.int64)
+        self.sums = np.zeros(shape)
+        self.means = np.zeros(shape)
+        self.wealth = np.zeros(replicates)
+        self._rows = np.arange(replicates)
+
+        if record_history:
+            self.decision_history = np.zeros(
+                (replicates, turns), dtype=decision_dtype(self.machine_count))
+        else:
+            self.decision_history = None
+
+        if all([m.mean is not None for m in machines]):
+            self.true_means = np.array([m.mean for m in machines], dtype=float)
+            self.best_machine_mean = self.true_means.max()
+            self.regret = np.zeros(replicates)
+        else:
+            self.regret = None
+
+        self._checkpoints = checkpoint_grid(turns, regret_checkpoints)
+        if self._checkpoints is None:
+            self._checkpoints = np.arange(turns + 1)
+        if self.regret is not None and record_history:
+            self.historical_regret = np.zeros((replicates,
+                                               len(self._checkpoints)))
+            # next column of historical_regret to fill; turn 0 is all zeros
+            self._next_column = int(np.searchsorted(self._checkpoints, 1))
+        else:
+            self.historical_regret = None
+
+        # rewards can be drawn in one call when every machine belongs to the
+        # same known family; otherwise fall back to spinning each machine
+        families = {m.family for m in machines}
+        self._family = families.pop() if len(families) == 1 else None
+        if self._family is not None:
+            self._params = np.array([m.params for m in machines], dtype=float)
+
+    def _spin(self, decisions):
+        """
+        Draws one reward for every replicate from the machines chosen.
+        """
+        if self._family == 'bernoulli':
+            p = self._params[decisions, 0]
+            return (self.rng.random(self.replicates) < p).astype(float)
+        if self._family == 'normal':
+            loc, scale = self._params[decisions].T
+            return self.rng.normal(loc, scale)
+        return np.array([self.machines[d].spin() for d in decisions],
+                        dtype=float)
+
+    def _update(self, decisions, outcomes):
+        """
+        Updates the attributes of every replicate after each turn.
+        Can be extended in the same way as Game._update.
+        """
+        rows = self._rows
+        self.counts[rows, decisions] += 1
+        self.sums[rows, decisions] += outcomes
+        self.means[rows, decisions] = (self.sums[rows, decisions]
+                                       / self.counts[rows, decisions])
+        self.wealth += outcomes
+        if self.regret is not None:
+            self.regret += self.best_machine_mean - self.true_means[decisions]
+            if self.historical_regret is not None:
+                column = self._next_column
+                if (column < len(self._checkpoints)
+                        and self._checkpoints[column] == self.next_turn):
+                    self.historical_regret[:, column] = self.regret
+                    self._next_column = column + 1
+
+    def _step(self):
+        """
+        Progresses every replicate by one time step.
+        """
+        decisions = self.decide()
+        if self.decision_history is not None:
+            self.decision_history[:, self.next_turn - 1] = decisions
+        outcomes = self._spin(decisions)
+        self._update(decisions, outcomes)
+        self.next_turn += 1
+
+    def _initial_round(self):
+        """
+        Returns the decisions of the round-robin opening used by the scalar
+        strategies (machine next_turn % machine_count).
+        """
+        return np.full(self.replicates, self.next_turn % self.machine_count)
+
+    def regret_curve(self):
+        """
+        Returns the turns at which the regret is recorded and the
+        R x len(turns) array of regret at those turns.
+        """
+        return self._checkpoints, self.historical_regret
+
+    def decide(self):
+        """
+        Returns an array holding the index of the chosen machine for every
+        replicate. Overwrite this.
+        """
+        pass
+
+    def simulate(self, output='outcome'):
+        """
+        Runs all replicates once. Accepts the same outputs as Game.simulate,
+        with arrays of length R in place of scalars.
+        """
+        while self.next_turn <= self.turns:
+            self._step()
+        if output == 'outcome':
+            return self.wealth
+
+        if output == "regret":
+            return self.regret
+
+        if output == "all":
+            return self.wealth, self.regret
+
+        if output == 'obj':
+            return self
+        raise Exception("Incorrect input type.")
+
+
+class ThompsonSamplingReplicates(ReplicateGame):
+    """
+    Thompson sampling using beta priors, played on R replicates.
+
+    Parameters
+    ----------
+        prior_parameters : list
+            Nested list containing the beta prior parameters for each machine
+            e.g. [[1,1], [1,1], [1,1]]
+        replicates : int
+            Number of replicates
+        turns : int
+            Number of turns to be played
+        *machines : list
+            List of Machines
+    """
+
+    def __init__(self, prior_parameters, replicates, turns, *machines,
+                 **kwargs):
+        super().__init__(replicates, turns, *machines, **kwargs)
+        priors = np.array(prior_parameters, dtype=float)
+        self.alpha = np.tile(priors[:, 0], (replicates, 1))
+        self.beta = np.tile(priors[:, 1], (replicates, 1))
+
+    def decide(self):
+        return np.argmax(self.rng.beta(self.alpha, self.beta), axis=1)
+
+    def _update(self, decisions, outcomes):
+        super()._update(decisions, outcomes)
+        success = outcomes == 1
+        self.alpha[self._rows, decisions] += success
+        self.beta[self._rows, decisions] += ~success
+
+
+class UCBReplicates(ReplicateGame):
+    """
+    UCB_bernoulli played on R replicates.
+
+    Parameters
+    ----------
+        replicates : int
+            Number of replicates
+        turns : int
+            Number of turns to be played
+        alpha : float
+            Exploration parameter of the UCB indices
+        *machines : list
+            List of Machines
+    """
+
+    def __init__(self, replicates, turns, alpha, *machines, **kwargs):
+        super().__init__(replicates, turns, *machines, **kwargs)
+        self.alpha = alpha
+        self.UCB_indices = np.zeros((replicates, self.machine_count))
+
+    def decide(self):
+        if self.next_turn <= self.machine_count:
+            return self._initial_round()
+        return np.argmax(self.UCB_indices, axis=1)
+
+    def _update(self, decisions, outcomes):
+        super()._update(decisions, outcomes)
+        if self.next_turn >= self.machine_count + 1:
+            self.UCB_indices = self.means + np.sqrt(
+                self.alpha * np.log(self.next_turn - 1) / (2 * self.counts))
+
+
+class EpsilonGreedyReplicates(ReplicateGame):
+    """
+    epsilon_greedy played on R replicates.
+
+    Parameters
+    ----------
+        replicates : int
+            Number of replicates
+        turns : int
+            Number of turns to be played
+        *machines : list
+            List of Machines
+        epsilon : float
+            Probability of exploring a uniformly chosen machine
+    """
+
+    def __init__(self, replicates, turns, *machines, epsilon=0.5, **kwargs):
+        super().__init__(replicates, turns, *machines, **kwargs)
+        self.epsilon = epsilon
+
+    def decide(self):
+        if self.next_turn <= self.machine_count:
+            return self._initial_round()
+        explore = self.rng.random(self.replicates) < self.epsilon
+        random_choice = self.rng.integers(self.machine_count,
+                                          size=self.replicates)
+        return np.where(explore, random_choice, np.argmax(self.means, axis=1))
@@ -0,0 +1,248 @@
+"""
+Columnar storage of simulation results.
+
+Rather than pickling whole Game objects (machine lambdas, full histories)
+into one bz2 file, a result set is a directory holding one .npy file per
+column plus a meta.json header:
+
+    regret.npy          replicates x checkpoints float64 regret
+    regret_turns.npy    turn of every regret column
+    decisions.npy       replicates x turns decisions (smallest uint type)
+    wealth.npy          final wealth of every replicate
+    pulls.npy           replicates x machines number of pulls per machine
+    meta.json           strategy, params, machine means, horizon, seeds, ...
+
+Columns are opened as read-only memory maps, so reading one column never
+touches the others and loading is close to free.
+
+A ResultStore groups many result sets, e.g. all the cells of a sweep, in
+one directory with an index.json mapping the name of every result set to
+its header fields.
+"""
+
+import bz2
+import json
+import os
+
+import numpy as np
+from infrastructure import decision_dtype
+
+
+COLUMNS = ('regret', 'regret_turns', 'decisions', 'wealth', 'pulls')
+
+
+def game_columns(games):
+    """
+    Returns the columns of a list of finished games as a dict of arrays.
+    Columns the games did not record (e.g. decisions in 'stats' mode) are
+    left out.
+    """
+    first = games[0]
+    columns = {'wealth': np.array([game.wealth for game in games], dtype=float)}
+    # games pickled before Game kept counts only have their history
+    columns['pulls'] = np.array(
+        [getattr(game, 'counts', None) or [len(h) for h in game.history]
+         for game in games], dtype=np.int64)
+    if first.historical_regret is not None:
+        columns['regret_turns'] = first.regret_curve()[0]
+        columns['regret'] = np.array([game.historical_regret
+                                      for game in games], dtype=float)
+    if first.decision_history is not None:
+        columns['decisions'] = np.array(
+            [game.decision_history for game in games],
+            dtype=decision_dtype(first.machine_count))
+    return columns
+
+
+def concat_columns(parts):
+    """
+    Concatenates the columns of several groups of games of the same
+    scenario, e.g. the chunks of a run, along the replicate axis.
+    """
+    columns = {}
+    for name in parts[0]:
+        if name == 'regret_turns':
+            columns[name] = parts[0][name]
+        else:
+            columns[name] = np.concatenate([part[name] for part in parts])
+    return columns
+
+
+def write_columns(path, columns, **metadata):
+    """
+    Writes a dict of column arrays and a metadata header to the directory
+    path, creating it if needed.
+    """
+    os.makedirs(path, exist_ok=True)
+    for name, column in columns.items():
+        np.save(os.path.join(path, f'{name}.npy'), column)
+    metadata['columns'] = sorted(columns)
+    with open(os.path.join(path, 'meta.json'), 'w') as handle:
+        json.dump(metadata, handle, indent=2, default=_to_json)
+
+
+def write_results(path, games, strategy=None, params=None, seeds=None,
+                  **metadata):
+    """
+    Writes a list of finished games of the same scenario as a result set.
+
+    Parameters:
+    -----------
+    path:
+        directory to write to
+    games:
+        list of finished Game objects
+    strategy:
+        name of the strategy, the class name of the games by default
+    params:
+        dict of the strategy parameters, stored in the header
+    seeds:
+        seeds used to play the games, stored in the header
+    **metadata:
+        any further JSON-serialisable fields for the header
+    """
+    first = games[0]
+    write_columns(path, game_columns(games),
+                  strategy=strategy or type(first).__name__,
+                  params=params or {},
+                  machine_means=[m.mean for m in first.machines],
+                  horizon=first.turns, replicates=len(games), seeds=seeds,
+                  **metadata)
+
+
+def _to_json(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return repr(value)
+
+
+class ResultSet:
+    """
+    A result set on disk. The header is read on construction and every
+    column is memory-mapped the first time it is accessed.
+
+    Attributes
+    ----------
+    path:
+        directory of the result set
+    meta:
+        dict holding the header (strategy, params, machine_means, horizon,
+        replicates, seeds, columns, ...)
+    regret, regret_turns, decisions, wealth, pulls:
+        the columns, as read-only arrays
+    """
+
+    def __init__(self, path, mmap_mode='r'):
+        self.path = path
+        self.mmap_mode = mmap_mode
+        with open(os.path.join(path, 'meta.json')) as handle:
+            self.meta = json.load(handle)
+        self._columns = {}
+
+    def column(self, name):
+        if name not in self._columns:
+            if name not in self.meta['columns']:
+                raise KeyError(f"{self.path} has no column {name!r}.")
+            self._columns[name] = np.load(
+                os.path.join(self.path, f'{name}.npy'), mmap_mode=self.mmap_mode)
+        return self._columns[name]
+
+    def __getattr__(self, name):
+        if name in COLUMNS:
+            return self.column(name)
+        raise AttributeError(name)
+
+    def __len__(self):
+        return self.meta['replicates']
+
+
+def convert_pickle(pickle_path, path=None, **metadata):
+    """
+    Converts a bz2 file of dill-pickled games written by the old scripts
+    into a result set, by default next to it without the .bz2 extension.
+    Returns the path of the result set.
+    """
+    import dill
+
+    if path is None:
+        path = os.path.splitext(pickle_path)[0]
+    with bz2.open(pickle_path, 'rb') as handle:
+        games = dill.load(handle)
+    write_results(path, games, source=os.path.basename(pickle_path),
+                  **metadata)
+    return path
+
+
+def load_results(path):
+    """
+    Opens a result set. A path to an old bz2 pickle is converted once and
+    the result set next to it is used from then on.
+    """
+    if path.endswith('.bz2'):
+        converted = os.path.splitext(path)[0]
+        if not os.path.exists(os.path.join(converted, 'meta.json')):
+            convert_pickle(path, converted)
+        path = converted
+    return ResultSet(path)
+
+
+class ResultStore:
+    """
+    A directory of result sets indexed by name. index.json maps the name of
+    every result set to its header fields (e.g. strategy, scenario, horizon
+    and replicates of a sweep cell) and the result set itself lives in the
+    subdirectory of the same name.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index = {}
+        if os.path.exists(self._index_path()):
+            with open(self._index_path()) as handle:
+                self.index = json.load(handle)
+
+    def _index_path(self):
+        return os.path.join(self.path, 'index.json')
+
+    def __contains__(self, name):
+        return (name in self.index and
+                os.path.exists(os.path.join(self.path, name, 'meta.json')))
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+    def add(self, name, columns, **metadata):
+        """
+        Writes a dict of column arrays as the result set name and records
+        its metadata in the index.
+        """
+        write_columns(os.path.join(self.path, name), columns, **metadata)
+        self.index[name] = metadata
+        # replace the index in one step so an interrupted sweep never
+        # leaves it half-written
+        temporary = self._index_path() + '.tmp'
+        with open(temporary, 'w') as handle:
+            json.dump(self.index, handle, indent=2, default=_to_json)
+        os.replace(temporary, self._index_path())
+
+    def open(self, name):
+        """
+        Returns the ResultSet of a name.
+        """
+        if name not in self:
+            raise KeyError(f"{self.path} has no result set {name!r}.")
+        return ResultSet(os.path.join(self.path, name))
+
+    def find(self, **fields):
+        """
+        Returns the names of the result sets whose index entry matches all
+        the given fields, e.g. store.find(scenario='many_arm').
+        """
+        return [name for name, entry in self.index.items()
+                if all(entry.get(key) == value
+                       for key, value in fields.items())]
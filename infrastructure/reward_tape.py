@@ -0,0 +1,101 @@
+"""
+Common random numbers through counter-based reward tapes.
+
+Strategies compared on independently drawn rewards need many replicates
+before their regret curves separate. With a RewardTape every strategy
+sees the same reward for the same pull of the same arm: the j-th pull of
+arm a in replicate r is always turned from the same uniform, which is
+computed on demand by the Philox counter-based generator keyed by
+(seed, replicate, arm) at counter j. Nothing is stored, any position can
+be read directly and the values do not depend on which process reads
+them or in which order.
+
+Example
+-------
+    machines = [bernoulli_machine(p) for p in [0.3, 0.5]]
+    ucb = UCB_bernoulli(1000, 2, *tape_machines(machines, seed=0, replicate=7))
+    ts = ThompsonSamplingBernoulli(priors, 1000,
+                                   *tape_machines(machines, 0, 7))
+"""
+
+import numpy as np
+from infrastructure import MACHINE_FACTORIES
+
+
+class RewardTape:
+    """
+    Uniforms keyed by (seed, replicate, arm, pull index).
+
+    Parameters
+    ----------
+        seed : int
+            Seed shared by all the strategies of a comparison
+        replicate : int
+            Index of the replicate
+    """
+
+    def __init__(self, seed=0, replicate=0):
+        self.seed = seed
+        self.replicate = replicate
+        self._keys = {}
+
+    def key(self, arm):
+        """
+        Returns the Philox key of an arm.
+        """
+        if arm not in self._keys:
+            entropy = np.random.SeedSequence([self.seed, self.replicate, arm])
+            self._keys[arm] = entropy.generate_state(2, np.uint64)
+        return self._keys[arm]
+
+    def uniforms(self, arm, start, n):
+        """
+        Returns the uniforms in [0, 1) of pulls start, ..., start + n - 1
+        of an arm.
+        """
+        # Philox produces 4 values per counter increment
+        block, lane = divmod(start, 4)
+        generator = np.random.Philox(key=self.key(arm), counter=[block, 0, 0, 0])
+        raw = generator.random_raw(n + lane)[lane:]
+        return (raw >> np.uint64(11)) * 2.0 ** -53
+
+
+class TapeReader:
+    """
+    Reads the uniforms of one arm of a tape in order, starting at a
+    given pull. Used as the uniforms source of a Machine.
+    """
+
+    def __init__(self, tape, arm, position=0):
+        self.tape = tape
+        self.arm = arm
+        self.position = position
+
+    def __call__(self, n):
+        uniforms = self.tape.uniforms(self.arm, self.position, n)
+        self.position += n
+        return uniforms
+
+
+def tape_machine(machine, tape, arm):
+    """
+    Returns a copy of a Bernoulli or normal machine whose outcomes are read
+    from the tape as arm.
+    """
+    if machine.family not in MACHINE_FACTORIES:
+        raise ValueError("Only machines of a known family can read a tape.")
+    copy = MACHINE_FACTORIES[machine.family](*machine.params,
+                                             buffer_size=machine.buffer_size)
+    copy.uniforms = TapeReader(tape, arm)
+    return copy
+
+
+def tape_machines(machines, seed, replicate):
+    """
+    Returns copies of the machines reading the tape of one replicate.
+    Games given the machines of the same seed and replicate see the same
+    outcome for the same pull of the same machine.
+    """
+    tape = RewardTape(seed, replicate)
+    return [tape_machine(machine, tape, arm)
+            for arm, machine in enumerate(machines)]
@@ -0,0 +1,228 @@
+"""
+Process-pool Monte Carlo runner.
+
+run_replicates plays many independent replicates of one strategy and fans
+them out over a ProcessPoolExecutor. Replicates are grouped in chunks of
+fixed size and every chunk seeds the global random and numpy RNGs from its
+own stream spawned off one numpy SeedSequence, so the results only depend
+on the seed and the chunk size, never on the number of workers.
+
+Example
+-------
+    from functools import partial
+    priors = [[1, 1]] * 3
+    regrets = run_replicates(partial(ThompsonSamplingBernoulli, priors),
+                             [('bernoulli', p) for p in [0.1, 0.1, 0.9]],
+                             turns=5000, replicates=100, seed=0)
+"""
+
+import copy
+import os
+import random
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from infrastructure import Game, Machine, machine_from_spec
+from reward_tape import tape_machines
+
+
+Progress = namedtuple('Progress', ['done', 'total', 'elapsed',
+                                   'replicates_per_second',
+                                   'turns_per_second', 'eta'])
+
+
+def report_progress(progress):
+    """
+    Prints a one-line progress report to stderr.
+    """
+    end = '\n' if progress.done == progress.total else ''
+    print(f"\r{progress.done}/{progress.total} replicates  "
+          f"{progress.replicates_per_second:.1f} replicates/s  "
+          f"{progress.turns_per_second:.0f} turns/s  "
+          f"ETA {progress.eta:.0f}s", end=end, file=sys.stderr, flush=True)
+
+
+def as_machines(specs):
+    """
+    Returns a list of machines from a list of machines and/or
+    specifications such as ('bernoulli', 0.3).
+    """
+    return [spec if isinstance(spec, Machine) else machine_from_spec(*spec)
+            for spec in specs]
+
+
+def seed_global_rngs(seed_sequence):
+    """
+    Seeds the random module and numpy's global RNG, which are the sources
+    used by the machines and strategies, from a numpy SeedSequence.
+    """
+    np.random.seed(seed_sequence.generate_state(4))
+    random.seed(int(seed_sequence.generate_state(1, np.uint64)[0]))
+
+
+def chunk_seeds(seed, replicates, chunk_size):
+    """
+    Returns the (size, SeedSequence) of every chunk of a run.
+    """
+    sizes = [min(chunk_size, replicates - start)
+             for start in range(0, replicates, chunk_size)]
+    return list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+
+
+def play(game, output):
+    """
+    Plays a game and returns game.simulate(output), or output(game) when
+    output is a callable.
+    """
+    if callable(output):
+        return output(game.simulate('obj'))
+    return game.simulate(output)
+
+
+def run_chunk(factory, machines, turns, size, seed_sequence, output,
+              reduce=None, tape_seed=None, first=0):
+    """
+    Plays size replicates in the current process and returns their outputs,
+    or reduce(outputs) when reduce is given.
+    Every chunk works on its own copy of the machines. With tape_seed,
+    replicate first + i reads its outcomes from the reward tape
+    (tape_seed, first + i) instead.
+    """
+    seed_global_rngs(seed_sequence)
+    if tape_seed is not None:
+        outputs = [play(factory(turns, *tape_machines(machines, tape_seed,
+                                                      first + i)), output)
+                   for i in range(size)]
+    else:
+        machines = copy.deepcopy(machines)
+        outputs = [play(factory(turns, *machines), output)
+                   for i in range(size)]
+    return outputs if reduce is None else reduce(outputs)
+
+
+def run_replicates(factory, machines, turns, replicates, output='regret',
+                   seed=None, workers=None, chunk_size=10, reduce=None,
+                   progress=report_progress, common_random_numbers=False,
+                   cache=None, merge=None):
+    """
+    Plays replicates independent games and returns the list of their
+    outputs, in replicate order. With reduce, returns the list of the
+    reduced outputs of every chunk instead, in chunk order, and with merge
+    as well, the single value they are merged into.
+
+    Parameters:
+    -----------
+    factory:
+        picklable callable building a game as factory(turns, *machines),
+        e.g. a Game subclass or functools.partial(ThompsonSamplingBernoulli,
+        priors)
+    machines:
+        list of machines or machine specifications such as ('bernoulli', 0.3)
+    turns:
+        horizon of every game
+    replicates:
+        number of games to play
+    output:
+        passed to Game.simulate, or a picklable callable applied to the
+        finished game
+    seed:
+        entropy of the root SeedSequence; None draws fresh entropy
+    workers:
+        number of worker processes, os.cpu_count() by default. With 1 the
+        chunks run in the current process; results are the same either way
+    chunk_size:
+        number of replicates sharing one RNG stream and one task
+    reduce:
+        picklable callable applied in the worker to the list of outputs of
+        a chunk, so that only the reduced value is sent back
+    merge:
+        with reduce, callable merge(merged, value) returning the merged
+        value of the chunks so far and the reduced value of the next chunk.
+        Chunks are merged in chunk order as soon as they have arrived and
+        then dropped, so the parent only holds the chunks finished out of
+        order
+    progress:
+        called with a Progress tuple after every chunk, None to disable
+    common_random_numbers:
+        if True, replicate r reads the outcomes of its machines from the
+        reward tape of (seed, r), so runs of different strategies with the
+        same seed see the same outcome for the same pull of the same machine
+    cache:
+        a cache.ResultCache; the outputs of a run already in the cache are
+        returned without playing any game. Requires a seed
+    """
+    machines = as_machines(machines)
+    if cache is not None:
+        if seed is None:
+            raise ValueError("Only runs with a seed can be cached.")
+        # workers and progress do not change the outputs
+        return cache.cached(
+            lambda: run_replicates(factory, machines, turns, replicates,
+                                   output, seed, workers, chunk_size, reduce,
+                                   progress, common_random_numbers,
+                                   merge=merge),
+            'run_replicates', factory, machines, turns, replicates, output,
+            seed, chunk_size, reduce, common_random_numbers,
+            Game.history_storage, Game.regret_checkpoints, merge)
+    chunks = chunk_seeds(seed, replicates, chunk_size)
+    tape_seed = None
+    if common_random_numbers:
+        tape_seed = np.random.SeedSequence(seed).entropy
+    firsts = range(0, replicates, chunk_size)
+    results = [None] * len(chunks)
+    start, done = time.perf_counter(), 0
+    # with merge: chunks finished out of order, the next chunk to merge
+    # and the merged value
+    pending, merged_count, merged = {}, 0, None
+
+    def record(i, outputs):
+        nonlocal done, merged_count, merged
+        if merge is None:
+            results[i] = outputs
+        else:
+            pending[i] = outputs
+            while merged_count in pending:
+                value = pending.pop(merged_count)
+                merged = value if merged_count == 0 else merge(merged, value)
+                merged_count += 1
+        done += chunks[i][0]
+        if progress is not None:
+            elapsed = max(time.perf_counter() - start, 1e-9)
+            rate = done / elapsed
+            progress(Progress(done, replicates, elapsed, rate, rate * turns,
+                              (replicates - done) / rate))
+
+    run_tasks([(i, (factory, machines, turns, size, seed_sequence, output,
+                    reduce, tape_seed, firsts[i]))
+               for i, (size, seed_sequence) in enumerate(chunks)],
+              workers, record)
+    if merge is not None:
+        return merged
+    if reduce is not None:
+        return results
+    return [value for outputs in results for value in outputs]
+
+
+def run_tasks(tasks, workers=None, callback=None):
+    """
+    Calls run_chunk(*arguments) for every (key, arguments) pair of tasks and
+    callback(key, result) as every call finishes. The calls run in the
+    current process, in order, when workers <= 1 and over a pool of
+    workers processes (os.cpu_count() by default) otherwise.
+    """
+    workers = os.cpu_count() if workers is None else workers
+    if workers <= 1:
+        for key, arguments in tasks:
+            result = run_chunk(*arguments)
+            if callback is not None:
+                callback(key, result)
+        return
+    with ProcessPoolExecutor(workers) as executor:
+        futures = {executor.submit(run_chunk, *arguments): key
+                   for key, arguments in tasks}
+        for future in as_completed(futures):
+            if callback is not None:
+                callback(futures[future], future.result())
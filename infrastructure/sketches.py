@@ -0,0 +1,173 @@
+"""
+Streaming quantile sketches for confidence bands across replicates.
+
+The bands of analysis_separate need every replicate's regret curve so that
+np.percentile can sort them. A QuantileSketch instead keeps, for every
+column (turn or checkpoint), a compact weighted sample of the values seen
+so far: it is updated with one regret curve per finished replicate and
+never holds the replicates x turns matrix.
+
+The sketch is a multi-level compactor (Manku-Rajagopalan-Lindsay / KLL
+style) run on all columns at once. Level l holds up to k rows of weight
+2**l; when it fills up its values are sorted column by column and every
+other one is promoted to level l + 1.
+
+Error bound
+-----------
+Each compaction at level l moves the rank of any value by at most 2**l,
+and level l is compacted at most n / (k 2**l) times after n updates. The
+rank of every reported quantile is therefore within
+
+    n * h / k,   h = number of levels = ceil(log2(n / k)) + 1
+
+of the exact one, i.e. a normalised rank error of at most h / k: 7 / 256,
+about 2.7%, for n = 10^4 and k = 256, and 5 / 1024, about 0.5%, with
+k = 1024. In practice errors of opposite sign cancel and the error is much
+smaller. Up to k updates the sketch holds every value, and percentiles are
+exact nearest-rank percentiles (the smallest value with at least p% of the
+values at or below it), not the interpolated ones of np.percentile.
+Merging two sketches keeps the same bound for the combined count, so
+worker processes can sketch their own replicates and the parent merges
+the results.
+"""
+
+from functools import partial
+
+import numpy as np
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch of a stream of rows of fixed length.
+
+    Parameters
+    ----------
+        columns : int
+            Length of every row (e.g. number of regret checkpoints)
+        k : int
+            Number of rows kept per level (even); larger is more accurate
+    """
+
+    def __init__(self, columns, k=256):
+        if k < 2 or k % 2:
+            raise ValueError("k must be an even number of at least 2.")
+        self.columns = columns
+        self.k = k
+        self.count = 0
+        self.total = np.zeros(columns)
+        self.levels = []
+        self._compactions = []
+
+    def update(self, row):
+        """
+        Adds one row, e.g. the regret curve of a finished replicate.
+        """
+        self.update_many(np.asarray(row, dtype=float)[None, :])
+
+    def update_many(self, rows):
+        """
+        Adds a 2-d array of rows.
+        """
+        rows = np.asarray(rows, dtype=float)
+        self.count += len(rows)
+        self.total += rows.sum(axis=0)
+        self._push(0, rows)
+
+    def merge(self, other):
+        """
+        Adds all the rows summarised by another sketch with the same k.
+        """
+        if other.columns != self.columns or other.k != self.k:
+            raise ValueError("Only sketches of the same shape and k merge.")
+        self.count += other.count
+        self.total += other.total
+        for level, rows in enumerate(other.levels):
+            self._push(level, rows)
+        return self
+
+    def _push(self, level, rows):
+        while len(self.levels) <= level:
+            self.levels.append(np.empty((0, self.columns)))
+            self._compactions.append(0)
+        rows = np.concatenate((self.levels[level], rows))
+        if len(rows) < self.k:
+            self.levels[level] = rows
+            return
+        # compact whole buffers of k rows, keeping the remainder
+        full = len(rows) - len(rows) % self.k
+        buffers = np.sort(rows[:full].reshape(-1, self.k, self.columns), axis=1)
+        self.levels[level] = rows[full:]
+        promoted = []
+        for buffer in buffers:
+            # alternate the kept half so rank errors tend to cancel
+            offset = self._compactions[level] % 2
+            self._compactions[level] += 1
+            promoted.append(buffer[offset::2])
+        self._push(level + 1, np.concatenate(promoted))
+
+    def mean(self):
+        """
+        Returns the exact mean of every column.
+        """
+        return self.total / self.count
+
+    def percentiles(self, percentiles):
+        """
+        Returns an array holding the requested nearest-rank percentiles
+        (0-100) of every column, one row per percentile.
+        """
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(rows), 2.0 ** level)
+                                  for level, rows in enumerate(self.levels)])
+        order = np.argsort(values, axis=0)
+        values = np.take_along_axis(values, order, axis=0)
+        ranks = np.cumsum(weights[order], axis=0)
+        result = np.empty((len(percentiles), self.columns))
+        for i, p in enumerate(percentiles):
+            target = max(p / 100 * ranks[-1, 0], np.finfo(float).tiny)
+            index = np.minimum((ranks < target).sum(axis=0), len(values) - 1)
+            result[i] = values[index, np.arange(self.columns)]
+        return result
+
+    def bands(self, confidences=(95,)):
+        """
+        Returns the mean and a dict mapping every confidence to its
+        (upper, lower) band, like bands.regret_bands.
+        """
+        percentiles = sorted({50 + sign * c / 2 for c in confidences
+                              for sign in (1, -1)})
+        rows = dict(zip(percentiles, self.percentiles(percentiles)))
+        return self.mean(), {c: (rows[50 + c / 2], rows[50 - c / 2])
+                             for c in confidences}
+
+
+def regret_values(game):
+    """
+    Returns the regret curve of a finished game as an array.
+    """
+    return np.asarray(game.historical_regret, dtype=float)
+
+
+def sketch_rows(rows, k=256):
+    """
+    Returns a QuantileSketch of a list of rows.
+    """
+    sketch = QuantileSketch(len(rows[0]), k)
+    sketch.update_many(np.array(rows))
+    return sketch
+
+
+def sketch_regret(factory, machines, turns, replicates, k=256, **kwargs):
+    """
+    Plays replicates games with runner.run_replicates and returns a
+    QuantileSketch of their regret curves. Every chunk is sketched in its
+    worker and the parent merges each chunk sketch, in chunk order, into
+    one running sketch as soon as it can and then drops it, so the full
+    regret matrix is never stored. kwargs are passed to run_replicates.
+    """
+    from runner import run_replicates
+
+    return run_replicates(factory, machines, turns, replicates,
+                          output=regret_values,
+                          reduce=partial(sketch_rows, k=k),
+                          merge=QuantileSketch.merge, **kwargs)
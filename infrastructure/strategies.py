@@ -0,0 +1,58 @@
+"""
+Registry of the strategies, imported lazily.
+
+Every strategy class is listed with the module defining it, and the module
+is only imported when the class is first used, so importing the registry
+costs nothing and a worker process only loads the strategies it plays:
+
+    from strategies import UCB1_tuned          # imports UCB1_fine_tuned
+    cls = get_strategy('ThompsonSamplingBernoulli')
+
+The package exposes the same names, e.g.
+from infrastructure import GreedyBayesianBernoulli.
+"""
+
+import importlib
+
+
+STRATEGY_MODULES = {
+    'ThompsonSamplingBernoulli': 'TS',
+    'LazyThompsonSamplingBernoulli': 'TS',
+    'RPMBernoulli': 'RPM',
+    'GreedyBayesianBernoulli': 'greedy_bayesian_bernoulli',
+    'UCB_bernoulli': 'UCB',
+    'UCB1': 'UCB1',
+    'UCB1_normal': 'UCB_normal',
+    'UCB1_tuned': 'UCB1_fine_tuned',
+    'WLLN': 'WLLN',
+    'epsilon_greedy': 'epsilon_greedy',
+    'Exp3': 'exp3',
+    'Exp3IX': 'exp3',
+    'Exp3P': 'exp3',
+    'RiggedGame': 'exp3',
+    'Zooming': 'zooming_algorithm',
+    'ReplicateGame': 'replicates',
+    'ThompsonSamplingReplicates': 'replicates',
+    'UCBReplicates': 'replicates',
+    'EpsilonGreedyReplicates': 'replicates',
+}
+
+
+def get_strategy(name):
+    """
+    Returns the strategy class called name, importing its module.
+    """
+    if name not in STRATEGY_MODULES:
+        raise KeyError(f"Unknown strategy {name!r}; known strategies are "
+                       f"{', '.join(STRATEGY_MODULES)}.")
+    return getattr(importlib.import_module(STRATEGY_MODULES[name]), name)
+
+
+def __getattr__(name):
+    if name in STRATEGY_MODULES:
+        return get_strategy(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(STRATEGY_MODULES))
@@ -0,0 +1,263 @@
+"""
+Parameterised simulation sweeps.
+
+A sweep plays every cell of the grid strategies x scenarios x horizons x
+replicate counts and writes every cell as a result set of one ResultStore.
+The chunks of all the missing cells are scheduled on one process pool, and
+cells already in the store are skipped, so re-running a sweep after adding
+a strategy only plays the new cells. A stored cell is only reused when its
+key, a digest of the strategy parameters, machines, seeding and the other
+inputs of the cell, matches; otherwise it is played again. Every cell is
+seeded from the sweep seed and its own name, so its results do not depend
+on the rest of the grid.
+
+Usage
+-----
+    bandit-sweep --strategies TS rpm gbb UCB1_tuned \\
+        --scenarios small2 many_arm --horizons 5000 --replicates 100
+
+    store = ResultStore('results')
+    regret = store.open('TS_many_arm_T5000_n100').regret
+"""
+
+import argparse
+import time
+import zlib
+from functools import partial
+
+from cache import digest
+from infrastructure import Game
+from results import ResultStore, concat_columns, game_columns
+from runner import (Progress, as_machines, chunk_seeds, report_progress,
+                    run_tasks)
+from strategies import get_strategy
+
+
+def bernoulli_scenario(probabilities):
+    return [('bernoulli', p) for p in probabilities]
+
+
+SCENARIOS = {
+    'default': bernoulli_scenario([0.33, 0.55, 0.6]),
+    'small2': bernoulli_scenario([0.5, 0.52]),
+    # the machines of the former rpm_write_large_increment.py
+    'small2_close': bernoulli_scenario([0.5, 0.505]),
+    'small_increment': bernoulli_scenario([0.01, 0.01, 0.02]),
+    'large_increment': bernoulli_scenario([0.1, 0.1, 0.9]),
+    'custom': bernoulli_scenario([0.05, 0.05, 0.95]),
+    'many_arm': bernoulli_scenario([round(0.2 + j * 0.05, 2)
+                                  for j in range(10)]),
+}
+
+
+def uniform_priors(machines):
+    return [[1, 1] for machine in machines]
+
+
+def thompson_sampling(turns, *machines):
+    return get_strategy('ThompsonSamplingBernoulli')(
+        uniform_priors(machines), turns, *machines)
+
+
+def randomised_probability_matching(turns, *machines, m=100,
+                                    method='monte_carlo', tolerance=0.0):
+    return get_strategy('RPMBernoulli')(uniform_priors(machines), m, turns,
+                                        *machines, method=method,
+                                        tolerance=tolerance)
+
+
+def greedy_bayesian(turns, *machines, threshold=0.02, ucb=0.95):
+    return get_strategy('GreedyBayesianBernoulli')(
+        uniform_priors(machines), threshold, ucb, turns, *machines)
+
+
+def ucb(turns, *machines, alpha=2):
+    return get_strategy('UCB_bernoulli')(turns, alpha, *machines)
+
+
+def ucb1_tuned(turns, *machines):
+    return get_strategy('UCB1_tuned')(turns, *machines)
+
+
+def exp3(turns, *machines):
+    return get_strategy('RiggedGame')(turns, *machines)
+
+
+# strategy name -> picklable factory(turns, *machines); the keywords of the
+# partial are the parameters stored with the results
+STRATEGIES = {
+    'TS': partial(thompson_sampling),
+    'rpm': partial(randomised_probability_matching, m=100),
+    'gbb': partial(greedy_bayesian, threshold=0.02, ucb=0.95),
+    'UCB': partial(ucb, alpha=2),
+    'UCB1_tuned': partial(ucb1_tuned),
+    'Exp3': partial(exp3),
+}
+
+
+def cell_name(strategy, scenario, horizon, replicates):
+    """
+    Returns the name of the result set of a cell,
+    e.g. 'TS_many_arm_T5000_n100'.
+    """
+    return f'{strategy}_{scenario}_T{horizon}_n{replicates}'
+
+
+def cell_seed(seed, name):
+    """
+    Returns the SeedSequence entropy of a cell, derived from the sweep seed
+    and the cell name only.
+    """
+    return [seed, zlib.crc32(name.encode())]
+
+
+def cell_key(strategy, scenario, horizon, replicates, seed, chunk_size,
+             common_random_numbers):
+    """
+    Returns the digest of everything that determines the results of a cell
+    (see cache.describe): the strategy factory with its parameters and
+    source, the machines, the horizon, the replicates, the seeding and the
+    storage settings of Game.
+    """
+    return digest('sweep cell', STRATEGIES[strategy], SCENARIOS[scenario],
+                  horizon, replicates, seed, chunk_size, common_random_numbers,
+                  Game.history_storage, Game.regret_checkpoints)
+
+
+def sweep(strategies, scenarios, horizons, replicates, store='results',
+          seed=0, workers=None, chunk_size=10, common_random_numbers=False,
+          progress=report_progress):
+    """
+    Plays every cell of the grid missing from the store, or stored with a
+    different key (see cell_key), e.g. another seed or other strategy
+    parameters, and returns the names of the cells played.
+
+    Parameters:
+    -----------
+    strategies, scenarios:
+        names of entries of STRATEGIES and SCENARIOS
+    horizons, replicates:
+        lists of horizons and replicate counts
+    store:
+        ResultStore or path of its directory
+    seed:
+        sweep seed; cells are seeded from it and their name
+    workers:
+        number of worker processes shared by all the cells, os.cpu_count()
+        by default
+    chunk_size:
+        number of replicates per task
+    common_random_numbers:
+        if True, replicate r of every cell reads the reward tape of
+        (seed, r), so strategies are compared on the same outcomes
+    progress:
+        called with a Progress tuple after every chunk, None to disable
+    """
+    if isinstance(store, str):
+        store = ResultStore(store)
+    tape_seed = seed if common_random_numbers else None
+    cells, tasks = {}, []
+    for strategy in strategies:
+        for scenario in scenarios:
+            for horizon in horizons:
+                for count in replicates:
+                    name = cell_name(strategy, scenario, horizon, count)
+                    key = cell_key(strategy, scenario, horizon, count, seed,
+                                   chunk_size, common_random_numbers)
+                    if name in cells or (name in store and
+                                         store.index[name].get('key') == key):
+                        continue
+                    entropy = cell_seed(seed, name)
+                    chunks = chunk_seeds(entropy, count, chunk_size)
+                    cells[name] = {
+                        'strategy': strategy, 'scenario': scenario,
+                        'horizon': horizon, 'replicates': count,
+                        'seed': entropy, 'chunk_size': chunk_size,
+                        'common_random_numbers': common_random_numbers,
+                        'key': key, 'parts': [None] * len(chunks)}
+                    machines = as_machines(SCENARIOS[scenario])
+                    for i, (size, seed_sequence) in enumerate(chunks):
+                        tasks.append(((name, i, size * horizon),
+                                      (STRATEGIES[strategy], machines,
+                                       horizon, size, seed_sequence, 'obj',
+                                       game_columns, tape_seed,
+                                       i * chunk_size)))
+
+    total = sum(cell['replicates'] for cell in cells.values())
+    start, done, turns = time.perf_counter(), 0, 0
+
+    def record(key, columns):
+        nonlocal done, turns
+        name, i, work = key
+        cell = cells[name]
+        cell['parts'][i] = columns
+        done += len(columns['wealth'])
+        turns += work
+        if all(part is not None for part in cell['parts']):
+            write_cell(store, name, cell)
+        if progress is not None:
+            elapsed = max(time.perf_counter() - start, 1e-9)
+            rate = done / elapsed
+            progress(Progress(done, total, elapsed, rate, turns / elapsed,
+                              (total - done) / rate))
+
+    run_tasks(tasks, workers, record)
+    return list(cells)
+
+
+def write_cell(store, name, cell):
+    """
+    Writes the finished cell to the store and releases its columns.
+    """
+    parts = cell.pop('parts')
+    factory = STRATEGIES[cell['strategy']]
+    specs = SCENARIOS[cell['scenario']]
+    store.add(name, concat_columns(parts), params=dict(factory.keywords),
+              machines=[list(spec) for spec in specs],
+              machine_means=[m.mean for m in as_machines(specs)], **cell)
+
+
+def main(argv=None):
+    """
+    Command line entry point (bandit-sweep).
+    """
+    parser = argparse.ArgumentParser(
+        description='Play a grid of strategies x scenarios x horizons x '
+                    'replicate counts into one result store, skipping the '
+                    'cells it already holds.')
+    parser.add_argument('--strategies', nargs='+', default=list(STRATEGIES),
+                        choices=list(STRATEGIES), metavar='STRATEGY')
+    parser.add_argument('--scenarios', nargs='+', default=list(SCENARIOS),
+                        choices=list(SCENARIOS), metavar='SCENARIO')
+    parser.add_argument('--horizons', nargs='+', type=int, default=[5000])
+    parser.add_argument('--replicates', nargs='+', type=int, default=[100])
+    parser.add_argument('--store', default='results',
+                        help='directory of the result store')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes (default: number of cores)')
+    parser.add_argument('--chunk-size', type=int, default=10)
+    parser.add_argument('--common-random-numbers', action='store_true',
+                        help='let all strategies see the same outcomes')
+    parser.add_argument('--list', action='store_true',
+                        help='list strategies, scenarios and stored cells')
+    args = parser.parse_args(argv)
+
+    store = ResultStore(args.store)
+    if args.list:
+        print('strategies:', ' '.join(STRATEGIES))
+        for name, specs in SCENARIOS.items():
+            print(f'scenario {name}:', [p for family, p in specs])
+        for name in store:
+            print('stored:', name)
+        return
+    played = sweep(args.strategies, args.scenarios, args.horizons,
+                   args.replicates, store, seed=args.seed,
+                   workers=args.workers, chunk_size=args.chunk_size,
+                   common_random_numbers=args.common_random_numbers)
+    print(f'{len(played)} cells played, {len(store)} cells in '
+          f'{args.store}', flush=True)
+
+
+if __name__ == '__main__':
+    main()
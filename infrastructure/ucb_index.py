@@ -0,0 +1,178 @@
+"""
+Index structures for UCB strategies with many arms.
+
+The indices of the UCB family have the form
+
+    index_i(t) = mean_i + width_i * s(t),    s(t) = sqrt(log t)
+
+where mean_i and width_i only change when arm i is pulled, and s only
+grows. IndexTree is a kinetic tournament tree over these lines: every node
+holds the arm with the largest index in its subtree and the value of s at
+which its comparison can first change (a certificate). A turn recomputes the
+path of the pulled arm and the nodes whose certificates have expired, so
+its cost is O(log K) plus the crossings of indices since the previous turn,
+instead of O(K).
+
+The comparisons use the strategy's own index function, so the arm returned
+is the one np.argmax would pick over all the indices, ties going to the
+lowest index. The lines only schedule comparisons: certificates fall due
+slightly before the lines cross (by MARGIN relative to the index), and
+arms whose indices differ by less than that, e.g. equal counts and means
+one rounding error apart, are compared again every turn.
+
+CountTree finds the lowest arm pulled fewer than a given number of times,
+for the forced exploration of UCB1-normal.
+"""
+
+import math
+
+
+INFINITY = math.inf
+MARGIN = 1e-12
+
+
+class IndexTree:
+    """
+    Kinetic tournament tree returning the argmax of the indices of the arms.
+
+    Parameters
+    ----------
+        count : int
+            Number of arms
+        index : callable
+            index(i) returns the exact current index of arm i
+        line : callable
+            line(i) returns (mean_i, width_i) of arm i
+
+    Attributes
+    ----------
+        best : int
+            Arm with the largest index, the lowest one among ties
+        comparisons : int
+            Number of node recomputations so far
+    """
+
+    def __init__(self, count, index, line):
+        self.count = count
+        self.index = index
+        self.line = line
+        self.size = 1 << max(count - 1, 0).bit_length()
+        self.winner = [-1] * (2 * self.size)
+        self.winner[self.size:self.size + count] = range(count)
+        self.certificate = [INFINITY] * (2 * self.size)
+        self.due = [INFINITY] * (2 * self.size)
+        self.means = [0.0] * count
+        self.widths = [0.0] * count
+        self.s = 0.0
+        self.comparisons = 0
+
+    @property
+    def best(self):
+        return self.winner[1]
+
+    def build(self, s):
+        """
+        Computes every node for the current indices, at s = sqrt(log t).
+        """
+        self.s = s
+        for arm in range(self.count):
+            self.means[arm], self.widths[arm] = self.line(arm)
+        for node in range(self.size - 1, 0, -1):
+            self._compare(node)
+
+    def update(self, arm, s):
+        """
+        Brings the tree up to date after arm was pulled and s has grown to
+        s = sqrt(log t).
+        """
+        self.s = s
+        self.means[arm], self.widths[arm] = self.line(arm)
+        node = (self.size + arm) >> 1
+        while node:
+            self.due[node] = -INFINITY
+            node >>= 1
+        self._advance(1)
+
+    def _advance(self, node):
+        # post-order over the nodes due, so children are settled first
+        if self.due[node] > self.s:
+            return
+        if node < self.size:
+            self._advance(2 * node)
+            self._advance(2 * node + 1)
+            self._compare(node)
+
+    def _compare(self, node):
+        self.comparisons += 1
+        left, right = self.winner[2 * node], self.winner[2 * node + 1]
+        certificate = INFINITY
+        if right < 0:
+            winner = left
+        elif left < 0:
+            winner = right
+        else:
+            # the left arm has the lower index, so it wins ties
+            left_index, right_index = self.index(left), self.index(right)
+            if left_index >= right_index:
+                winner, loser, top = left, right, left_index
+            else:
+                winner, loser, top = right, left, right_index
+            means, widths = self.means, self.widths
+            margin = MARGIN * max(1.0, abs(top))
+            if widths[loser] > widths[winner]:
+                certificate = ((means[winner] - means[loser] - margin)
+                               / (widths[loser] - widths[winner]))
+            elif (means[winner] - means[loser] + (widths[winner]
+                  - widths[loser]) * self.s < margin
+                  and (means[winner], widths[winner])
+                  != (means[loser], widths[loser])):
+                # different lines this close can swap on rounding alone
+                certificate = self.s
+            if certificate <= self.s:
+                # too close to call on the lines; compare again next turn
+                certificate = math.nextafter(self.s, INFINITY)
+        self.winner[node] = winner
+        self.certificate[node] = certificate
+        self.due[node] = min(certificate, self.due[2 * node],
+                             self.due[2 * node + 1])
+
+
+class CountTree:
+    """
+    Segment tree of the number of pulls of the arms, finding the lowest arm
+    pulled fewer than a given number of times in O(log K).
+    """
+
+    def __init__(self, count):
+        self.count = count
+        self.size = 1 << max(count - 1, 0).bit_length()
+        self.minimum = [INFINITY] * (2 * self.size)
+        for arm in range(count):
+            self.minimum[self.size + arm] = 0
+        for node in range(self.size - 1, 0, -1):
+            self.minimum[node] = min(self.minimum[2 * node],
+                                     self.minimum[2 * node + 1])
+
+    def set(self, arm, pulls):
+        """
+        Sets the number of pulls of arm.
+        """
+        node = self.size + arm
+        self.minimum[node] = pulls
+        node >>= 1
+        while node:
+            self.minimum[node] = min(self.minimum[2 * node],
+                                     self.minimum[2 * node + 1])
+            node >>= 1
+
+    def lowest_below(self, threshold):
+        """
+        Returns the lowest arm pulled fewer than threshold times, or None.
+        """
+        minimum = self.minimum
+        if not minimum[1] < threshold:
+            return None
+        node = 1
+        while node < self.size:
+            node = 2 * node if minimum[2 * node] < threshold else 2 * node + 1
+        return node - self.size
@@ -0,0 +1,107 @@
+"""
+Sampling arms in proportion to weights.
+
+random.choices(range(K), weights) accumulates all K weights on every call.
+WeightedSampler keeps the partial sums in a Fenwick tree instead, so
+changing one weight and drawing an arm both cost O(log K), and many arms
+can be drawn at once with draw_batch:
+
+    sampler = WeightedSampler(weights)
+    arm = sampler.sample(random())
+    sampler.update(arm, 2.5)
+    arms = sampler.draw_batch(np.random.random(1000))
+
+Draws follow the same rule as random.choices: arm i is returned for
+u * total in [w_0 + ... + w_{i-1}, w_0 + ... + w_i), so arms of weight 0
+are never drawn.
+"""
+
+import numpy as np
+
+
+class WeightedSampler:
+    """
+    Fenwick tree over the weights of the arms.
+
+    Parameters
+    ----------
+        weights : array_like
+            Non-negative weights of the arms
+        rebuild_every : int
+            Number of updates after which the tree is summed again from the
+            weights, so rounding errors do not accumulate; max(K, 1024) by
+            default
+
+    Attributes
+    ----------
+        weights : ndarray
+            Current weights
+        total : float
+            Sum of the weights
+    """
+
+    def __init__(self, weights, rebuild_every=None):
+        self.weights = np.array(weights, dtype=float)
+        self.count = len(self.weights)
+        self.rebuild_every = rebuild_every or max(self.count, 1024)
+        # highest power of two not above count, where searches start
+        self._top = 1 << (self.count.bit_length() - 1) if self.count else 0
+        self.rebuild()
+
+    def rebuild(self):
+        """
+        Recomputes the tree and the total from the weights, in O(K).
+        """
+        # node i (1-based) holds the sum of the weights (i - lowbit(i), i]
+        cumulative = np.concatenate([[0.0], np.cumsum(self.weights)])
+        nodes = np.arange(1, self.count + 1)
+        self.tree = np.zeros(self.count + 1)
+        self.tree[1:] = cumulative[nodes] - cumulative[nodes - (nodes & -nodes)]
+        self.total = float(cumulative[-1])
+        self.updates = 0
+
+    def update(self, arm, weight):
+        """
+        Sets the weight of arm.
+        """
+        delta = weight - self.weights[arm]
+        self.weights[arm] = weight
+        self.updates += 1
+        if self.updates >= self.rebuild_every:
+            self.rebuild()
+            return
+        self.total += delta
+        tree, node = self.tree, arm + 1
+        while node <= self.count:
+            tree[node] += delta
+            node += node & -node
+
+    def sample(self, u):
+        """
+        Returns the arm drawn by a uniform u on [0, 1).
+        """
+        value = u * self.total
+        tree, position, step = self.tree, 0, self._top
+        while step:
+            node = position + step
+            if node <= self.count and tree[node] <= value:
+                position = node
+                value -= tree[node]
+            step >>= 1
+        return min(position, self.count - 1)
+
+    def draw_batch(self, u):
+        """
+        Returns the arms drawn by an array of uniforms on [0, 1).
+        """
+        value = np.asarray(u, dtype=float) * self.total
+        position = np.zeros(value.shape, dtype=np.int64)
+        step = self._top
+        while step:
+            node = position + step
+            partial = self.tree[np.minimum(node, self.count)]
+            go = (node <= self.count) & (partial <= value)
+            position[go] = node[go]
+            value[go] -= partial[go]
+            step >>= 1
+        return np.minimum(position, self.count - 1)
@@ -1,7 +1,5 @@
 import numpy as np
 import abc
-import matplotlib.pyplot as plt
-from scipy.stats import pareto
 
 class Algorithm(metaclass=abc.ABCMeta):  # abstract class of `Algorithm`
     def __init__(self, delta, T, c):
@@ -9,10 +7,13 @@ class Algorithm(metaclass=abc.ABCMeta):  # abstract class of `Algorithm`
         self.T = T
         self.c = c
         self.pulled_idx = None
-        self.active_arms = None
-        self.mu = None
-        self.n = None
-        self.r = None
+        self._arms = None
+        self._mu = None
+        self._n = None
+        self._count = 0
+        # positions of the arms ordered by location, and their locations
+        self._order = None
+        self._sorted_arms = None
 
     @abc.abstractmethod
     def initialize(self):
@@ -26,53 +27,123 @@ class Algorithm(metaclass=abc.ABCMeta):  # abstract class of `Algorithm`
     def observe(self, t, y):
         pass
 
+    def _reset_arms(self, capacity=64):
+        # arms, means and counts in contiguous arrays, doubled when full
+        self._arms = np.zeros(capacity)
+        self._mu = np.zeros(capacity)
+        self._n = np.zeros(capacity, dtype=np.int64)
+        self._count = 0
+        self._order = np.zeros(0, dtype=np.int64)
+        self._sorted_arms = np.zeros(0)
+
+    @property
+    def active_arms(self):
+        return self._arms[:self._count]
+
+    @property
+    def mu(self):
+        return self._mu[:self._count]
+
+    @property
+    def n(self):
+        return self._n[:self._count]
+
+    @property
+    def r(self):
+        return self.radii()
+
+    def radii(self):
+        return np.zeros(self._count)
+
+    def add_arm(self, arm):
+        """
+        Activates an arm at location arm and returns its index.
+        """
+        idx = self._count
+        if idx == len(self._arms):
+            self._arms = np.concatenate((self._arms, np.zeros_like(self._arms)))
+            self._mu = np.concatenate((self._mu, np.zeros_like(self._mu)))
+            self._n = np.concatenate((self._n, np.zeros_like(self._n)))
+        self._arms[idx] = arm
+        self._count += 1
+        rank = np.searchsorted(self._sorted_arms, arm, side='right')
+        self._sorted_arms = np.insert(self._sorted_arms, rank, arm)
+        self._order = np.insert(self._order, rank, idx)
+        return idx
+
     def get_uncovered(self):
-        covered = [[arm - r, arm + r] for arm, r in zip(self.active_arms, self.r)]
-        if covered == []:
+        """
+        Returns the leftmost interval of [0, 1] not covered by the balls
+        [arm - r, arm + r] of the active arms, or None.
+        """
+        if self._count == 0:
             return [0, 1]
-        covered.sort(key=lambda x: x[0])
-        low = 0
-        for interval in covered:
-            if interval[0] <= low:
-                low = max(low, interval[1])
-                if low >= 1:
-                    return None
-            else:
-                return [low, interval[0]]
-        return [low, 1]
+        arms = self._sorted_arms
+        r = self.radii()[self._order]
+        # with the arms ordered by location, the points between the j-th and
+        # (j + 1)-th arms are covered up to the largest right end of the
+        # first j + 1 balls and from the smallest left end of the others
+        right = np.maximum.accumulate(arms + r)
+        left = np.minimum.accumulate((arms - r)[::-1])[::-1]
+        low = np.concatenate(([0], right))
+        high = np.concatenate((left, [1]))
+        gaps = np.flatnonzero((low < high) & (low < 1))
+        if len(gaps) == 0:
+            return None
+        j = gaps[0]
+        if j == self._count:
+            return [low[j], 1]
+        return [low[j], high[j]]
 
 
 class Zooming(Algorithm):
+    """
+    Zooming algorithm for Lipschitz bandits on [0, 1].
+
+    The radius of arm i after turn t is c nu t^(1/3) / sqrt(n_i), so the
+    radii are not stored: they are computed, vectorised, from the shared
+    factor c nu t^(1/3) and the counts when a decision needs them. The arms
+    are also kept ordered by location, so the leftmost uncovered interval
+    is found by one pass of running extrema instead of sorting the balls.
+    """
+
     def __init__(self, delta, T, c, nu):
         super().__init__(delta, T, c)
         self.nu = nu
+        self._factor = 0.0
+        self._radii = None
 
     def initialize(self):
-        self.active_arms = []
-        self.mu = []
-        self.n = []
-        self.r = []
+        self._reset_arms()
+        self._factor = 0.0
+        self._radii = None
+
+    def radii(self):
+        # computed once per turn; arms not observed yet have radius 0
+        if self._radii is None:
+            n = self.n
+            self._radii = np.where(n > 0,
+                                   self._factor / np.sqrt(np.maximum(n, 1)), 0)
+        return self._radii
 
     def output(self):
         uncovered = self.get_uncovered()
         if uncovered is None:
-            score = [mu + 2 * r for mu, r in zip(self.mu, self.r)]
+            score = self.mu + 2 * self.radii()
             self.pulled_idx = np.argmax(score)
         else:
             new_arm = np.random.uniform(*uncovered)
-            self.active_arms.append(new_arm)
-            self.mu.append(0)
-            self.n.append(0)
-            self.r.append(0)
-            self.pulled_idx = len(self.active_arms) - 1
+            self.pulled_idx = self.add_arm(new_arm)
+            self._radii = None
         return self.pulled_idx
 
     def observe(self, t, y):
         idx = self.pulled_idx
-        self.mu[idx] = (self.mu[idx] * self.n[idx] + y) / (self.n[idx] + 1)
-        self.n[idx] += 1
-        for i, n in enumerate(self.n):
-            self.r[i] = self.c * self.nu * np.power(t, 1 / 3) / np.sqrt(n)
+        mu, n = self._mu[idx], self._n[idx]
+        self._mu[idx] = (mu * n + y) / (n + 1)
+        self._n[idx] = n + 1
+        self._factor = self.c * self.nu * np.power(t, 1 / 3)
+        self._radii = None
 
 def simulate(algorithm, a, alpha, T, trials):
     cum_regret = np.zeros((len(algorithm), T + 1))
@@ -86,7 +157,10 @@ def simulate(algorithm, a, alpha, T, trials):
                 idx = alg.output()
                 arm = alg.active_arms[idx]
                 inst_regret[i, t] = min(abs(arm - 0.4), abs(arm - 0.8))
-                y = a - min(abs(arm - 0.4), abs(arm - 0.8)) + pareto.rvs(alpha) - alpha / (alpha - 1)
+                # Pareto(alpha) noise by inversion, the same draws as
+                # scipy.stats.pareto.rvs(alpha) without its per-call overhead
+                noise = (1 - np.random.random_sample()) ** (-1.0 / alpha)
+                y = a - min(abs(arm - 0.4), abs(arm - 0.8)) + noise - alpha / (alpha - 1)
                 alg.observe(t, y)
 
         cum_regret += np.cumsum(inst_regret, axis=-1)
@@ -96,6 +170,8 @@ def upper_bound(t, delta, multiplier, zooming_dim):
     return delta*t + multiplier*np.log(t)*((1/delta)**(1+zooming_dim))
 
 def run_experiment(a):
+    import matplotlib.pyplot as plt
+
     # configure parameters of experiments
     T = 10000 #pre: 2000
     trials = 500 #pre: 40
@@ -2,5 +2,11 @@ from setuptools import setup, find_packages
 setup(
     name="bandit",
     version="060722-0.1",
-    packages=find_packages()
-)
\ No newline at end of file
+    packages=find_packages(),
+    entry_points={
+        'console_scripts': [
+            'bandit-sweep = infrastructure.sweep:main',
+            'bandit-benchmark = infrastructure.benchmark:main',
+        ],
+    },
+)
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from infrastructure import Game, bernoulli_machine, checkpoint_grid
+from replicates import UCBReplicates
+
+
+def test_grid_forms():
+    assert checkpoint_grid(100, None) is None
+    np.testing.assert_array_equal(checkpoint_grid(100, 25),
+                                  [0, 25, 50, 75, 100])
+    np.testing.assert_array_equal(checkpoint_grid(100, np.int64(40)),
+                                  [0, 40, 80, 100])
+    np.testing.assert_array_equal(checkpoint_grid(100, [50, 10, 10, 300]),
+                                  [0, 10, 50, 100])
+    np.testing.assert_array_equal(checkpoint_grid(100, np.array([5, 50])),
+                                  [0, 5, 50, 100])
+    np.testing.assert_array_equal(checkpoint_grid(100, ('log', 3)),
+                                  [0, 1, 10, 100])
+    grid = checkpoint_grid(10**5, 'log')
+    assert grid[0] == 0 and grid[-1] == 10**5
+    assert np.all(np.diff(grid) > 0) and len(grid) <= 101
+
+
+@pytest.mark.parametrize('checkpoints', [0, -5, ('log', 0), ('log', 2.5),
+                                         'lin', ('lin', 3)])
+def test_invalid_grids(checkpoints):
+    with pytest.raises(ValueError):
+        checkpoint_grid(100, checkpoints)
+
+
+@pytest.fixture
+def restore_game():
+    storage, checkpoints = Game.history_storage, Game.regret_checkpoints
+    yield
+    Game.history_storage, Game.regret_checkpoints = storage, checkpoints
+
+
+class FirstMachine(Game):
+    def decide(self):
+        return self.next_turn % 2
+
+
+@pytest.mark.parametrize('storage', ['list', 'array', 'stats'])
+def test_game_checkpoints_match_full_curve(restore_game, storage):
+    machines = [bernoulli_machine(p) for p in [0.3, 0.7]]
+    np.random.seed(0)
+    full = FirstMachine(300, *machines).simulate('obj')
+    Game.history_storage = storage
+    Game.regret_checkpoints = ('log', 10)
+    np.random.seed(0)
+    sparse = FirstMachine(300, *machines).simulate('obj')
+    turns, regret = sparse.regret_curve()
+    np.testing.assert_array_equal(turns, checkpoint_grid(300, ('log', 10)))
+    np.testing.assert_allclose(regret, full.regret_curve()[1][turns])
+
+
+def test_replicate_checkpoints_match_full_curve():
+    machines = [bernoulli_machine(p) for p in [0.2, 0.5, 0.6]]
+    full = UCBReplicates(5, 400, 2, *machines, seed=1).simulate('obj')
+    for checkpoints in [7, ('log', 12), [3, 50, 399]]:
+        sparse = UCBReplicates(5, 400, 2, *machines, seed=1,
+                               regret_checkpoints=checkpoints)
+        sparse.simulate('obj')
+        turns, regret = sparse.regret_curve()
+        np.testing.assert_array_equal(turns,
+                                      checkpoint_grid(400, checkpoints))
+        np.testing.assert_array_equal(regret,
+                                      full.historical_regret[:, turns])
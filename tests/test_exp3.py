@@ -0,0 +1,12 @@
+import pytest
+from infrastructure import bernoulli_machine
+from instrumentation import instrumented
+from strategies import get_strategy
+
+
+@pytest.mark.parametrize('name', ['Exp3', 'Exp3IX', 'Exp3P'])
+def test_instrumented_updates_are_timed(name):
+    machines = [bernoulli_machine(p) for p in [0.3, 0.6, 0.5]]
+    game = instrumented(get_strategy(name))(100, *machines)
+    game.simulate()
+    assert game.instrumentation.game_updates == 100
@@ -0,0 +1,76 @@
+import numpy as np
+from infrastructure import bernoulli_machine
+from replicates import (EpsilonGreedyReplicates, ThompsonSamplingReplicates,
+                        UCBReplicates)
+from runner import run_replicates
+from strategies import get_strategy
+
+
+PROBABILITIES = [0.3, 0.5, 0.6]
+TURNS = 200
+REPLICATES = 300
+
+
+def machines():
+    return [bernoulli_machine(p) for p in PROBABILITIES]
+
+
+def final_regret(game):
+    return game.regret
+
+
+def scalar_regrets(factory):
+    return np.array(run_replicates(
+        factory, [('bernoulli', p) for p in PROBABILITIES], TURNS,
+        REPLICATES, output=final_regret, seed=0, workers=1, progress=None))
+
+
+def check_same_distribution(lockstep, scalar):
+    # the means of the final regret agree within four standard errors
+    error = np.sqrt(lockstep.var() / len(lockstep)
+                    + scalar.var() / len(scalar))
+    assert abs(lockstep.mean() - scalar.mean()) < 4 * error
+
+
+def thompson_sampling(turns, *machines):
+    return get_strategy('ThompsonSamplingBernoulli')(
+        [[1, 1]] * len(machines), turns, *machines)
+
+
+def ucb(turns, *machines):
+    return get_strategy('UCB_bernoulli')(turns, 2, *machines)
+
+
+def epsilon_greedy(turns, *machines):
+    return get_strategy('epsilon_greedy')(turns, *machines, epsilon=0.3)
+
+
+def test_thompson_sampling():
+    game = ThompsonSamplingReplicates([[1, 1]] * 3, REPLICATES, TURNS,
+                                      *machines(), seed=1)
+    game.simulate()
+    check_same_distribution(game.regret, scalar_regrets(thompson_sampling))
+
+
+def test_ucb():
+    game = UCBReplicates(REPLICATES, TURNS, 2, *machines(), seed=1)
+    game.simulate()
+    check_same_distribution(game.regret, scalar_regrets(ucb))
+
+
+def test_epsilon_greedy():
+    game = EpsilonGreedyReplicates(REPLICATES, TURNS, *machines(),
+                                   epsilon=0.3, seed=1)
+    game.simulate()
+    check_same_distribution(game.regret, scalar_regrets(epsilon_greedy))
+
+
+def test_initial_round_and_bookkeeping():
+    game = UCBReplicates(5, 30, 2, *machines(), seed=2)
+    game.simulate()
+    # every replicate plays each machine once first, in the scalar order
+    np.testing.assert_array_equal(game.decision_history[:, :3],
+                                  np.tile([1, 2, 0], (5, 1)))
+    assert np.all(game.counts.sum(axis=1) == 30)
+    np.testing.assert_allclose(game.sums.sum(axis=1), game.wealth)
+    np.testing.assert_allclose(game.historical_regret[:, -1], game.regret)
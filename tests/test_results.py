@@ -0,0 +1,72 @@
+import bz2
+import os
+import shutil
+
+import numpy as np
+import pytest
+from infrastructure import Game, bernoulli_machine
+from results import ResultStore, game_columns, load_results
+
+dill = pytest.importorskip('dill')
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))), 'infrastructure')
+
+
+class Alternate(Game):
+    def decide(self):
+        return self.next_turn % self.machine_count
+
+
+def check_columns(result, games):
+    np.testing.assert_array_equal(result.wealth,
+                                  [game.wealth for game in games])
+    np.testing.assert_array_equal(result.pulls,
+                                  [[len(h) for h in game.history]
+                                   for game in games])
+    np.testing.assert_allclose(result.regret,
+                               [game.historical_regret for game in games])
+    np.testing.assert_array_equal(result.regret_turns,
+                                  np.arange(games[0].turns + 1))
+    np.testing.assert_array_equal(result.decisions,
+                                  [game.decision_history for game in games])
+    assert result.meta['replicates'] == len(games)
+    assert result.meta['horizon'] == games[0].turns
+
+
+def test_old_bz2_results_round_trip(tmp_path):
+    source = os.path.join(DATA, 'UCB_large.bz2')
+    shutil.copy(source, tmp_path)
+    with bz2.open(source, 'rb') as handle:
+        games = dill.load(handle)
+    result = load_results(str(tmp_path / 'UCB_large.bz2'))
+    check_columns(result, games)
+    assert result.meta['source'] == 'UCB_large.bz2'
+    # converted once, then read back from the .npy columns
+    os.remove(tmp_path / 'UCB_large.bz2')
+    check_columns(load_results(str(tmp_path / 'UCB_large')), games)
+
+
+def test_new_games_round_trip_through_bz2(tmp_path):
+    machines = [bernoulli_machine(p) for p in [0.2, 0.5, 0.8]]
+    np.random.seed(0)
+    games = [Alternate(50, *machines).simulate('obj') for i in range(4)]
+    path = str(tmp_path / 'alternate.bz2')
+    with bz2.open(path, 'wb') as handle:
+        dill.dump(games, handle)
+    check_columns(load_results(path), games)
+
+
+def test_store_index(tmp_path):
+    machines = [bernoulli_machine(p) for p in [0.2, 0.5]]
+    games = [Alternate(20, *machines).simulate('obj') for i in range(3)]
+    store = ResultStore(str(tmp_path))
+    store.add('a', game_columns(games), scenario='two', horizon=20)
+    store.add('b', game_columns(games[:1]), scenario='one', horizon=20)
+    reopened = ResultStore(str(tmp_path))
+    assert set(reopened) == {'a', 'b'}
+    assert reopened.find(scenario='two') == ['a']
+    np.testing.assert_array_equal(reopened.open('a').wealth,
+                                  [game.wealth for game in games])
+    with pytest.raises(KeyError):
+        reopened.open('c')
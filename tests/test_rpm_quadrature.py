@@ -0,0 +1,34 @@
+import numpy as np
+from RPM import BestArmQuadrature, win_probabilities
+
+
+def monte_carlo(parameters, draws=400000, seed=0):
+    a, b = np.array(parameters, dtype=float).T
+    samples = np.random.default_rng(seed).beta(a, b, size=(draws, len(a)))
+    return np.bincount(samples.argmax(axis=1), minlength=len(a)) / draws
+
+
+def test_win_probabilities_match_monte_carlo():
+    for parameters in [[[1, 1], [1, 1]],
+                       [[2, 5], [3, 3], [4, 2]],
+                       [[30, 70], [35, 65], [10, 90], [1, 1]],
+                       [[1500, 1600], [1510, 1590], [2000, 2000]]]:
+        probabilities = win_probabilities(parameters)
+        assert abs(probabilities.sum() - 1) < 1e-12
+        np.testing.assert_allclose(probabilities, monte_carlo(parameters),
+                                   atol=0.005)
+
+
+def test_updates_match_a_fresh_quadrature():
+    rng = np.random.default_rng(1)
+    parameters = np.ones((6, 2))
+    means = np.linspace(0.3, 0.6, 6)
+    quadrature = BestArmQuadrature(parameters)
+    for step in range(400):
+        arm = rng.integers(6)
+        parameters[arm, rng.random() >= means[arm]] += 1
+        quadrature.update(arm, *parameters[arm])
+        if step % 50 == 49:
+            np.testing.assert_allclose(quadrature.probabilities(),
+                                       win_probabilities(parameters),
+                                       atol=1e-6)
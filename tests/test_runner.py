@@ -0,0 +1,38 @@
+from functools import partial
+
+import numpy as np
+from runner import run_replicates
+from strategies import get_strategy
+from sweep import ucb
+
+
+MACHINES = [('bernoulli', 0.3), ('bernoulli', 0.5), ('bernoulli', 0.55)]
+
+
+def thompson_sampling(turns, *machines):
+    return get_strategy('ThompsonSamplingBernoulli')(
+        [[1, 1]] * len(machines), turns, *machines)
+
+
+def regret_curve(game):
+    return np.asarray(game.historical_regret)
+
+
+def test_results_do_not_depend_on_workers():
+    for factory in [thompson_sampling,
+                    partial(get_strategy('epsilon_greedy'), epsilon=0.3),
+                    partial(ucb, alpha=2)]:
+        runs = [run_replicates(factory, MACHINES, 200, 7, output=regret_curve,
+                               seed=11, workers=workers, chunk_size=3,
+                               progress=None)
+                for workers in [1, 2, 3]]
+        for run in runs[1:]:
+            np.testing.assert_array_equal(np.array(run), np.array(runs[0]))
+
+
+def test_seed_changes_results():
+    first, second = [run_replicates(thompson_sampling, MACHINES, 200, 4,
+                                    output=regret_curve, seed=seed,
+                                    workers=1, progress=None)
+                     for seed in [1, 2]]
+    assert not np.array_equal(np.array(first), np.array(second))
@@ -0,0 +1,105 @@
+import math
+from functools import partial
+
+import numpy as np
+import pytest
+from runner import run_replicates
+from sketches import (QuantileSketch, regret_values, sketch_regret,
+                      sketch_rows)
+from strategies import get_strategy
+
+
+MACHINES = [('bernoulli', 0.3), ('bernoulli', 0.5), ('bernoulli', 0.55)]
+
+
+def nearest_rank(values, p):
+    ordered = np.sort(values, axis=0)
+    rank = max(math.ceil(p / 100 * len(values)), 1)
+    return ordered[rank - 1]
+
+
+def rank_error(values, estimate, p):
+    # distance between the rank of the estimate and the requested rank
+    n = len(values)
+    below = (values < estimate).sum(axis=0)
+    at_or_below = (values <= estimate).sum(axis=0)
+    target = p / 100 * n
+    return np.maximum(0, np.maximum(below - target,
+                                    target - at_or_below)) / n
+
+
+def test_exact_up_to_k():
+    values = np.random.default_rng(0).normal(size=(200, 5))
+    sketch = QuantileSketch(5, k=256)
+    sketch.update_many(values)
+    for p in [1, 5, 50, 95, 100]:
+        np.testing.assert_array_equal(sketch.percentiles([p])[0],
+                                      nearest_rank(values, p))
+    np.testing.assert_allclose(sketch.mean(), values.mean(axis=0))
+
+
+@pytest.mark.parametrize('k', [64, 256])
+def test_rank_error_within_bound(k):
+    n = 10**4
+    values = np.random.default_rng(k).exponential(size=(n, 3))
+    sketch = QuantileSketch(3, k=k)
+    for row in values:
+        sketch.update(row)
+    levels = math.ceil(math.log2(n / k)) + 1
+    for p in [2.5, 25, 50, 75, 97.5]:
+        estimate = sketch.percentiles([p])[0]
+        assert np.all(rank_error(values, estimate, p) <= levels / k)
+
+
+def test_merge_keeps_the_bound():
+    n, k = 6000, 128
+    values = np.random.default_rng(1).normal(size=(n, 2))
+    merged = QuantileSketch(2, k=k)
+    for part in np.array_split(values, 7):
+        sketch = QuantileSketch(2, k=k)
+        sketch.update_many(part)
+        merged.merge(sketch)
+    assert merged.count == n
+    np.testing.assert_allclose(merged.mean(), values.mean(axis=0))
+    levels = math.ceil(math.log2(n / k)) + 1
+    for p in [5, 50, 95]:
+        estimate = merged.percentiles([p])[0]
+        assert np.all(rank_error(values, estimate, p) <= levels / k)
+
+
+def test_odd_k_is_rejected():
+    with pytest.raises(ValueError):
+        QuantileSketch(3, k=7)
+
+
+def thompson_sampling(turns, *machines):
+    return get_strategy('ThompsonSamplingBernoulli')(
+        [[1, 1]] * len(machines), turns, *machines)
+
+
+def regret_curve(game):
+    return np.asarray(game.historical_regret)
+
+
+def test_merged_sketch_does_not_depend_on_workers():
+    sketches = [sketch_regret(thompson_sampling, MACHINES, 150, 12, k=4,
+                              seed=5, workers=workers, chunk_size=2,
+                              progress=None)
+                for workers in [1, 3]]
+    np.testing.assert_array_equal(sketches[0].percentiles([5, 50, 95]),
+                                  sketches[1].percentiles([5, 50, 95]))
+    curves = np.array(run_replicates(thompson_sampling, MACHINES, 150, 12,
+                                     output=regret_curve, seed=5, workers=1,
+                                     chunk_size=2, progress=None))
+    np.testing.assert_allclose(sketches[0].mean(), curves.mean(axis=0))
+
+
+def test_merge_matches_the_list_of_chunks():
+    chunks = run_replicates(thompson_sampling, MACHINES, 100, 6,
+                            output=regret_values, seed=3, workers=1, chunk_size=2,
+                            reduce=partial(sketch_rows, k=8), progress=None)
+    merged = run_replicates(thompson_sampling, MACHINES, 100, 6,
+                            output=regret_values, seed=3, workers=2, chunk_size=2,
+                            reduce=partial(sketch_rows, k=8),
+                            merge=QuantileSketch.merge, progress=None)
+    assert merged.count == sum(chunk.count for chunk in chunks) == 6
@@ -0,0 +1,23 @@
+from functools import partial
+
+import numpy as np
+import sweep
+
+
+def test_cells_are_replayed_when_their_inputs_change(tmp_path, monkeypatch):
+    store = str(tmp_path)
+    run = partial(sweep.sweep, ['UCB'], ['small2'], [50], [4], store,
+                  workers=1, chunk_size=2, progress=None)
+    assert run(seed=0) == ['UCB_small2_T50_n4']
+    assert run(seed=0) == []
+    first = np.array(sweep.ResultStore(store).open('UCB_small2_T50_n4').wealth)
+    assert run(seed=1) == ['UCB_small2_T50_n4']
+    assert run(seed=1, common_random_numbers=True) == ['UCB_small2_T50_n4']
+    monkeypatch.setitem(sweep.STRATEGIES, 'UCB',
+                        partial(sweep.ucb, alpha=4))
+    assert run(seed=1, common_random_numbers=True) == ['UCB_small2_T50_n4']
+    assert run(seed=1, common_random_numbers=True) == []
+    monkeypatch.undo()
+    assert run(seed=0) == ['UCB_small2_T50_n4']
+    np.testing.assert_array_equal(
+        sweep.ResultStore(store).open('UCB_small2_T50_n4').wealth, first)
@@ -0,0 +1,61 @@
+import bz2
+import pickle
+
+import numpy as np
+import pytest
+from infrastructure import bernoulli_machine
+from results import load_results
+from strategies import get_strategy
+
+
+def test_lazy_thompson_sampling_draws_like_thompson_sampling():
+    priors = [[20, 80], [30, 70], [25, 75], [1, 1]]
+    machines = [bernoulli_machine(p) for p in [0.2, 0.3, 0.25, 0.1]]
+    draws = 20000
+    frequencies = []
+    for name in ['ThompsonSamplingBernoulli',
+                 'LazyThompsonSamplingBernoulli']:
+        np.random.seed(0)
+        game = get_strategy(name)(priors, draws, *machines)
+        decisions = [game.decide() for i in range(draws)]
+        frequencies.append(np.bincount(decisions, minlength=4) / draws)
+    np.testing.assert_allclose(frequencies[0], frequencies[1], atol=0.015)
+
+
+def legacy_game():
+    """
+    Returns a finished game shaped like those pickled before the posteriors
+    were kept in a BetaPosteriors: a post_parameters list, no posteriors.
+    """
+    machines = [bernoulli_machine(p) for p in [0.3, 0.6]]
+    game = get_strategy('ThompsonSamplingBernoulli')([[1, 1], [1, 1]], 50,
+                                                     *machines)
+    game.simulate()
+    parameters = game.post_parameters
+    for name in ['posteriors', 'top_k', '_queue']:
+        del game.__dict__[name]
+    game.__dict__['post_parameters'] = parameters
+    return game, parameters
+
+
+def test_legacy_pickles_load():
+    game, parameters = legacy_game()
+    state = np.random.get_state()
+    loaded = pickle.loads(pickle.dumps(game))
+    assert loaded.post_parameters == parameters
+    assert loaded.top_k == 1
+    assert loaded.decide() in (0, 1)
+    # loading does not draw from the global RNG
+    assert np.array_equal(np.random.get_state()[1], state[1])
+
+
+def test_legacy_results_convert(tmp_path):
+    dill = pytest.importorskip('dill')
+    games = [legacy_game()[0] for i in range(3)]
+    path = str(tmp_path / 'ts.bz2')
+    with bz2.open(path, 'wb') as handle:
+        dill.dump(games, handle)
+    result = load_results(path)
+    np.testing.assert_array_equal(result.wealth,
+                                  [game.wealth for game in games])
+    assert result.meta['strategy'] == 'ThompsonSamplingBernoulli'
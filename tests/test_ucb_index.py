@@ -0,0 +1,94 @@
+import math
+import random
+
+import numpy as np
+import pytest
+from infrastructure import bernoulli_machine, normal_machine
+from strategies import get_strategy
+from ucb_index import CountTree, IndexTree
+
+
+def play_index_tree(count, turns, seed):
+    """
+    Pulls random arms with random outcomes and checks after every turn that
+    the tree returns np.argmax of the UCB1 indices.
+    """
+    rng = random.Random(seed)
+    counts = [1] * count
+    sums = [float(rng.random() < 0.5) for arm in range(count)]
+
+    def index(arm):
+        return (sums[arm] / counts[arm]
+                + math.sqrt(2 / counts[arm]) * math.sqrt(math.log(t)))
+
+    def line(arm):
+        return sums[arm] / counts[arm], math.sqrt(2 / counts[arm])
+
+    t = count + 1
+    tree = IndexTree(count, index, line)
+    tree.build(math.sqrt(math.log(t)))
+    for step in range(turns):
+        assert tree.best == int(np.argmax([index(i) for i in range(count)]))
+        arm = tree.best if rng.random() < 0.7 else rng.randrange(count)
+        counts[arm] += 1
+        sums[arm] += rng.random() < 0.3 + 0.4 * arm / count
+        t += 1
+        tree.update(arm, math.sqrt(math.log(t)))
+
+
+def test_index_tree_matches_argmax():
+    for count in [1, 2, 3, 7, 16, 33]:
+        play_index_tree(count, 500, seed=count)
+
+
+def test_index_tree_breaks_ties_to_lowest_arm():
+    tree = IndexTree(5, lambda arm: 1.0, lambda arm: (1.0, 0.0))
+    tree.build(1.0)
+    assert tree.best == 0
+    tree.update(3, 2.0)
+    assert tree.best == 0
+
+
+def test_count_tree_lowest_below():
+    rng = random.Random(0)
+    count = 13
+    pulls = [0] * count
+    tree = CountTree(count)
+    for step in range(300):
+        arm = rng.randrange(count)
+        pulls[arm] += 1
+        tree.set(arm, pulls[arm])
+        threshold = rng.randrange(1, 30)
+        expected = next((i for i in range(count) if pulls[i] < threshold),
+                        None)
+        assert tree.lowest_below(threshold) == expected
+
+
+def play_checking_argmax(game):
+    """
+    Plays game and checks before every turn that its index tree holds
+    np.argmax of the indices the strategy exposes.
+    """
+    checked = 0
+    while game.next_turn <= game.turns:
+        if game.index_tree is not None:
+            assert game.index_tree.best == int(np.argmax(game.indices()))
+            checked += 1
+        game._step()
+    assert checked > game.turns // 2
+
+
+@pytest.mark.parametrize('count', [2, 5, 40])
+def test_ucb_bernoulli_plays_the_argmax(count):
+    np.random.seed(count)
+    machines = [bernoulli_machine(p) for p in np.linspace(0.2, 0.6, count)]
+    game = get_strategy('UCB_bernoulli')(2000, 2, *machines)
+    play_checking_argmax(game)
+
+
+@pytest.mark.parametrize('count', [2, 6])
+def test_ucb1_normal_plays_the_argmax(count):
+    np.random.seed(count)
+    machines = [normal_machine(m, 1) for m in np.linspace(0, 1, count)]
+    game = get_strategy('UCB1_normal')(2000, *machines)
+    play_checking_argmax(game)
@@ -0,0 +1,62 @@
+import bisect
+import itertools
+
+import numpy as np
+import pytest
+from weighted_sampler import WeightedSampler
+
+
+def reference_sample(weights, u):
+    # the rule of random.choices
+    cumulative = list(itertools.accumulate(weights))
+    return bisect.bisect(cumulative, u * cumulative[-1], 0,
+                         len(weights) - 1)
+
+
+def test_sample_follows_random_choices():
+    rng = np.random.default_rng(0)
+    for count in [1, 2, 5, 8, 31]:
+        weights = rng.random(count)
+        weights[rng.random(count) < 0.2] = 0
+        weights[-1] += 0.1
+        sampler = WeightedSampler(weights)
+        for u in rng.random(200):
+            assert sampler.sample(u) == reference_sample(weights, u)
+
+
+def test_zero_weights_are_never_drawn():
+    sampler = WeightedSampler([0.0, 1.0, 0.0, 2.0, 0.0])
+    arms = sampler.draw_batch(np.random.default_rng(1).random(10000))
+    assert set(np.unique(arms)) == {1, 3}
+
+
+def test_updates_match_a_fresh_tree():
+    rng = np.random.default_rng(2)
+    weights = rng.random(20)
+    sampler = WeightedSampler(weights, rebuild_every=10**6)
+    for step in range(500):
+        arm = rng.integers(20)
+        weights[arm] = rng.random() * 3
+        sampler.update(arm, weights[arm])
+    fresh = WeightedSampler(weights)
+    np.testing.assert_allclose(sampler.tree, fresh.tree)
+    assert sampler.total == pytest.approx(weights.sum())
+    u = rng.random(1000)
+    np.testing.assert_array_equal(sampler.draw_batch(u), fresh.draw_batch(u))
+
+
+def test_draw_batch_matches_sample():
+    rng = np.random.default_rng(3)
+    sampler = WeightedSampler(rng.random(37))
+    u = rng.random(1000)
+    np.testing.assert_array_equal(sampler.draw_batch(u),
+                                  [sampler.sample(x) for x in u])
+
+
+def test_distribution():
+    weights = np.array([1.0, 2.0, 3.0, 4.0])
+    sampler = WeightedSampler(weights)
+    arms = sampler.draw_batch(np.random.default_rng(4).random(200000))
+    frequencies = np.bincount(arms, minlength=4) / len(arms)
+    np.testing.assert_allclose(frequencies, weights / weights.sum(),
+                               atol=0.005)